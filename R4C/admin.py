@@ -0,0 +1,121 @@
+"""
+Admin building blocks for tables too large for the stock changelist.
+
+``LargeTableAdmin`` never counts more than ``ADMIN_COUNT_LIMIT`` rows, falls back to
+the planner's row estimate for the unfiltered table and pages by primary key, so a
+changelist page costs the same few queries whatever the size of the table.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ADMIN_COUNT_LIMIT = getattr(settings, 'ADMIN_COUNT_LIMIT', 10_000)
+ADMIN_PAGE_BOUNDARY_TTL = 5 * 60
+
+
+def estimate_row_count(model):
+    """
+    Get the database's estimate of the number of rows in a model's table, without counting them.
+
+    PostgreSQL keeps the estimate in ``pg_class``; SQLite has one in ``sqlite_stat1``
+    once ``ANALYZE`` has run.
+
+    Args:
+        model: The model class.
+
+    Returns:
+        int | None: The estimated number of rows, or None if the database has no estimate.
+    """
+    connection = connections[model.objects.db]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # The first number of an index's stat is the number of rows in the table
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate > 0 else None
+
+
+class LargeTablePaginator(Paginator):
+    """
+    A paginator for changelists over millions of rows.
+
+    The count stops at ``ADMIN_COUNT_LIMIT`` rows; beyond that the unfiltered table
+    reports the database's estimate and a filtered one reports the limit, so narrow
+    the filters to reach later pages. Pages of a list ordered by primary key are found
+    by seeking past the last key of the previous page, which is remembered for a few
+    minutes, so paging forward never scans the rows already shown. Other pages read
+    only the keys at the offset and then fetch their rows by primary key.
+    """
+
+    @cached_property
+    def count(self):
+        capped = self.object_list.order_by()[:ADMIN_COUNT_LIMIT + 1].count()
+        if capped <= ADMIN_COUNT_LIMIT:
+            return capped
+        if not self.object_list.query.where:
+            estimate = estimate_row_count(self.object_list.model)
+            if estimate is not None and estimate > ADMIN_COUNT_LIMIT:
+                return estimate
+        return ADMIN_COUNT_LIMIT
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+
+        seek = self._seek_lookup()
+        boundary = cache.get(self._boundary_key(number - 1)) if seek and number > 1 else None
+        if boundary is not None:
+            keys = self.object_list.filter(**{seek: boundary}).values_list('pk', flat=True)[:top - bottom]
+        else:
+            keys = self.object_list.values_list('pk', flat=True)[bottom:top]
+        keys = list(keys)
+        if seek and keys:
+            cache.set(self._boundary_key(number), keys[-1], ADMIN_PAGE_BOUNDARY_TTL)
+        return self._get_page(self.object_list.filter(pk__in=keys), number, self)
+
+    def _seek_lookup(self):
+        # The lookup continuing a list ordered by primary key alone, or None for other orderings
+        ordering = tuple(self.object_list.query.order_by)
+        pk_name = self.object_list.model._meta.pk.name
+        if ordering in (('-pk',), (f'-{pk_name}',)):
+            return 'pk__lt'
+        if ordering in (('pk',), (pk_name,)):
+            return 'pk__gt'
+        return None
+
+    def _boundary_key(self, number):
+        sql, params = self.object_list.query.sql_with_params()
+        digest = hashlib.sha1(f'{sql}{params}{self.per_page}'.encode()).hexdigest()
+        return f'admin-page-boundary:{digest}:{number}'
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base admin for the robot and order tables.
+
+    Lists newest rows first by primary key and uses ``LargeTablePaginator``. The total
+    size of the table is not counted next to filtered results.
+    """
+    paginator = LargeTablePaginator
+    show_full_result_count = False
+    ordering = ('-id',)
+    list_per_page = 100
@@ -3,6 +3,11 @@ ASGI config for R4C project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the order status long-poll and event stream endpoints from this application:
+a waiting client is an idle coroutine here, while under WSGI it holds a worker thread.
+Status changes reach waiting clients through ``orders.events.order_status_hub``, which
+is per process, so run it as few processes with many connections each.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 """
@@ -0,0 +1,299 @@
+"""
+In-process request, query, signal handler and email metrics in the Prometheus text format.
+
+Histograms live in the memory of each process and are cheap to update (a bisect and a
+short lock per observation), so the middleware can stay enabled in production. With
+several worker processes each one reports its own numbers; the outbox worker serves
+its email metrics on a separate port (``send_outbox_emails --metrics-port``).
+"""
+import functools
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_ALLOWED_IPS = getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+METRICS_TOKEN = getattr(settings, 'METRICS_TOKEN', None)
+# Other methods share one label value, so arbitrary methods cannot grow the series
+METRIC_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+# Query statistics of the request being handled. The threads sync_to_async runs
+# the ORM in inherit the context, so queries of async views are counted too.
+_request_queries = ContextVar('request_queries', default=None)
+
+
+class Histogram:
+    """
+    A Prometheus histogram with one series per combination of label values.
+
+    Attributes:
+        name (str): The metric name.
+        documentation (str): The help text.
+        labels (tuple): The label names.
+        buckets (tuple): The upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """
+        Record one observation.
+
+        Args:
+            value (float): The observed value.
+            label_values: The values of the histogram labels, in order.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), the sum and the count
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def get_count(self, *label_values):
+        # Get the number of observations of one series
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[2] if series else 0
+
+    def render(self):
+        """
+        Render the histogram in the Prometheus text format.
+
+        Returns:
+            list: The lines of the exposition.
+        """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = sorted(
+                (label_values, list(counts), total, count)
+                for label_values, (counts, total, count) in self._series.items()
+            )
+        for label_values, counts, total, count in snapshot:
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)]
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                bucket_labels = ','.join([*labels, f'le="{bound}"'])
+                lines.append(f'{self.name}_bucket{{{bucket_labels}}} {cumulative}')
+            suffix = f'{{{",".join(labels)}}}' if labels else ''
+            lines.append(f'{self.name}_sum{suffix} {total}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_DURATION = Histogram(
+    'r4c_request_duration_seconds', 'Request latency by URL name.', ('view', 'method'),
+)
+REQUEST_QUERIES = Histogram(
+    'r4c_request_queries', 'Database queries per request by URL name.', ('view', 'method'),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_QUERY_DURATION = Histogram(
+    'r4c_request_query_duration_seconds', 'Database time per request by URL name.', ('view', 'method'),
+)
+SIGNAL_HANDLER_DURATION = Histogram(
+    'r4c_signal_handler_duration_seconds', 'Signal receiver run time by receiver.', ('handler',),
+)
+EMAIL_SEND_DURATION = Histogram(
+    'r4c_email_send_duration_seconds', 'Time to send one email over SMTP by outcome.', ('outcome',),
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_QUERIES, REQUEST_QUERY_DURATION, SIGNAL_HANDLER_DURATION, EMAIL_SEND_DURATION)
+
+
+class QueryStats:
+    """
+    Queries executed while handling one request.
+
+    Attributes:
+        count (int): The number of queries.
+        duration (float): Their total run time in seconds.
+    """
+
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding each query of a request to its ``QueryStats``.
+
+    Queries run outside of a request (e.g. in management commands) are executed as is.
+    """
+    stats = _request_queries.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.duration += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Every new connection gets the wrapper, whichever thread opens it
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording the latency, query count and query time of every request.
+
+    Requests are labeled with the name of the matched URL pattern, or ``unmatched``
+    if none matched. Works for both sync and async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started, stats, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(request, started, stats, token)
+        return response
+
+    async def __acall__(self, request):
+        started, stats, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(request, started, stats, token)
+        return response
+
+    @staticmethod
+    def start():
+        # Connections opened before this module was imported have no wrapper yet
+        install_query_recorder(sender=None, connection=connection)
+        stats = QueryStats()
+        return time.perf_counter(), stats, _request_queries.set(stats)
+
+    @staticmethod
+    def finish(request, started, stats, token):
+        duration = time.perf_counter() - started
+        _request_queries.reset(token)
+        match = request.resolver_match
+        method = request.method if request.method in METRIC_METHODS else 'other'
+        labels = (match.url_name or match.view_name if match else 'unmatched', method)
+        REQUEST_DURATION.observe(duration, *labels)
+        REQUEST_QUERIES.observe(stats.count, *labels)
+        REQUEST_QUERY_DURATION.observe(stats.duration, *labels)
+
+
+def timed_receiver(func):
+    """
+    Decorator recording the run time of a signal receiver.
+
+    Apply it below ``@receiver``, so the timed wrapper is what gets connected.
+    """
+    name = f'{func.__module__}.{func.__name__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            SIGNAL_HANDLER_DURATION.observe(time.perf_counter() - started, name)
+
+    return wrapper
+
+
+def render_metrics():
+    # Render all histograms in the Prometheus text format
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    View exposing the metrics of this process in the Prometheus text format.
+
+    The endpoint is meant for the internal scraper. With ``METRICS_TOKEN`` set, only
+    requests with an ``Authorization: Bearer <token>`` header are served. Otherwise
+    only clients from ``METRICS_ALLOWED_IPS`` are served, which is no protection
+    behind a reverse proxy on the same host: every client then has its address.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
+
+
+def metrics_allowed(request):
+    # Check the bearer token if one is configured, or else the client address
+    if METRICS_TOKEN:
+        expected = f'Bearer {METRICS_TOKEN}'.encode()
+        return hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected)
+    return request.META.get('REMOTE_ADDR') in METRICS_ALLOWED_IPS
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """
+    Serve the metrics of this process over HTTP from a daemon thread.
+
+    Used by processes that serve no Django requests, such as the outbox worker.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
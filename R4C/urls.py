@@ -16,8 +16,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from R4C.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/robots/', include('robots.urls')),
-    path('api/v1/orders/', include('orders.urls'))
+    path('api/v1/orders/', include('orders.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,77 @@
+"""
+Microbenchmark of request decoding and validation for the JSON endpoints.
+
+Compares the Django forms path (``json.loads`` of the decoded body plus
+``RobotCreateForm``/``OrderCreateForm``) with the schema path used by the views
+(``json.loads`` of the raw body plus ``ROBOT_SCHEMA``/``ORDER_SCHEMA``). The SKU catalog
+is primed in memory, so neither path touches the database:
+
+    python benchmarks/codec_benchmark.py
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'R4C.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from orders.forms import OrderCreateForm  # noqa: E402
+from orders.schema import ORDER_SCHEMA  # noqa: E402
+from robots.catalog import catalog  # noqa: E402
+from robots.forms import RobotCreateForm  # noqa: E402
+from robots.models import RobotSku  # noqa: E402
+from robots.schema import ROBOT_SCHEMA  # noqa: E402
+
+PAYLOADS = {
+    'robot': (
+        RobotCreateForm,
+        ROBOT_SCHEMA,
+        json.dumps({'model': 'R2', 'version': 'D2', 'created': '2023-01-01 00:00:01'}).encode(),
+    ),
+    'robot_invalid': (
+        RobotCreateForm,
+        ROBOT_SCHEMA,
+        json.dumps({'model': 'Invalid Model', 'version': 'D2', 'created': '01.01.2023'}).encode(),
+    ),
+    'order': (
+        OrderCreateForm,
+        ORDER_SCHEMA,
+        json.dumps({'customer_email': 'customer@example.com', 'robot_model': 'R2', 'robot_version': 'D2'}).encode(),
+    ),
+}
+
+
+def forms_path(form_class, body):
+    form = form_class(json.loads(body.decode('utf-8')))
+    form.is_valid()
+    return form.errors
+
+
+def schema_path(schema, body):
+    return schema.validate(json.loads(body))[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000, help='Calls per measurement.')
+    parser.add_argument('--repeat', type=int, default=5, help='Measurements, the best one is reported.')
+    args = parser.parse_args()
+    catalog.set_skus([RobotSku(id=1, model='R2', version='D2')])
+
+    print(f"{'payload':<16}{'forms us':>12}{'schema us':>12}{'speedup':>10}")
+    for name, (form_class, schema, body) in PAYLOADS.items():
+        forms = min(timeit.repeat(lambda: forms_path(form_class, body), number=args.number, repeat=args.repeat))
+        fast = min(timeit.repeat(lambda: schema_path(schema, body), number=args.number, repeat=args.repeat))
+        forms_us = forms / args.number * 1e6
+        fast_us = fast / args.number * 1e6
+        print(f'{name:<16}{forms_us:>12.2f}{fast_us:>12.2f}{forms_us / fast_us:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Synthetic data generator for the benchmark suite.
+
+Fills the database with the SKU catalog, customers, robots across many models and versions, and
+orders: fulfilled orders holding ordered robots, and a backlog of waiting orders
+for serials that are sold out. The generated state is consistent with what the
+endpoints would have produced, including the production rollup and stock counters.
+Django has to be set up before this module is imported.
+"""
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import Order
+from robots.models import Robot, RobotSku
+from robots.rollup import rebuild_production_rollup
+from robots.stock import rebuild_stock_counters
+
+MODELS = [f'{letter}{digit}' for letter in 'RCXTM' for digit in '23579']
+VERSIONS = [f'{letter}{digit}' for letter in 'DPLS' for digit in '1234']
+BATCH_SIZE = 5000
+
+
+def serials():
+    # All (model, version) pairs the generator produces robots for
+    return [(model, version) for model in MODELS for version in VERSIONS]
+
+
+def generate(robots, customers, orders, days=30, sold_out_share=0.1, ordered_share=0.3, seed=0):
+    """
+    Generate a reproducible data set.
+
+    Args:
+        robots (int): The number of robots.
+        customers (int): The number of customers.
+        orders (int): The number of orders, split between fulfilled and waiting ones.
+        days (int): The robots' creation times are spread over this many past days.
+        sold_out_share (float): The share of serials whose robots are all ordered.
+        ordered_share (float): The share of robots of the other serials that are ordered.
+        seed (int): The random seed.
+
+    Returns:
+        dict: The number of generated rows per table.
+    """
+    rng = random.Random(seed)
+    all_serials = serials()
+    rng.shuffle(all_serials)
+    sold_out = set(all_serials[:max(1, int(len(all_serials) * sold_out_share))])
+    now = timezone.now()
+
+    RobotSku.objects.bulk_create(RobotSku(model=model, version=version) for model, version in serials())
+    sku_ids = {(sku.model, sku.version): sku.id for sku in RobotSku.objects.all()}
+    Customer.objects.bulk_create(
+        (Customer(email=f'customer{number}@example.com') for number in range(customers)),
+        batch_size=BATCH_SIZE,
+    )
+    customer_ids = list(Customer.objects.values_list('id', flat=True))
+
+    fulfilled = 0
+    for start in range(0, robots, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, robots - start)):
+            model, version = rng.choice(all_serials)
+            ordered = (model, version) in sold_out or rng.random() < ordered_share
+            created = now - timedelta(seconds=rng.uniform(60, days * 24 * 60 * 60))
+            batch.append(Robot(sku_id=sku_ids[model, version], created=created, ordered=ordered))
+        with transaction.atomic():
+            batch = Robot.objects.bulk_create(batch)
+            # Every ordered robot belongs to a fulfilled order while the order budget lasts
+            ready_orders = [
+                Order(customer_id=rng.choice(customer_ids), sku_id=robot.sku_id, robot=robot, status='READY')
+                for robot in batch if robot.ordered
+            ][:max(0, orders - fulfilled)]
+            Order.objects.bulk_create(ready_orders)
+        fulfilled += len(ready_orders)
+
+    sold_out_sku_ids = [sku_ids[key] for key in sorted(sold_out)]
+    waiting = orders - fulfilled
+    for start in range(0, waiting, BATCH_SIZE):
+        Order.objects.bulk_create(
+            Order(
+                customer_id=rng.choice(customer_ids),
+                sku_id=rng.choice(sold_out_sku_ids),
+                status='ROBOT_IS_OUT_OF_STOCK',
+            )
+            for _ in range(min(BATCH_SIZE, waiting - start))
+        )
+
+    # bulk_create skips the receivers maintaining the derived tables
+    rebuild_production_rollup()
+    rebuild_stock_counters()
+    return {'skus': len(sku_ids), 'customers': customers, 'robots': robots, 'orders': fulfilled + max(0, waiting)}
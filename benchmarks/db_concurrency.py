@@ -0,0 +1,140 @@
+"""
+Write throughput of concurrent robot creation and ordering under each database profile.
+
+Every profile runs in its own process against a fresh database, sending a mix of
+robot creation and order requests from several threads through the Django test client,
+so connections are opened and closed per request exactly as ``CONN_MAX_AGE`` dictates:
+
+    python benchmarks/db_concurrency.py --threads 8 --requests 2000
+
+The ``default`` profile is Django's stock SQLite setup (rollback journal, no busy timeout
+PRAGMA, a new connection per request); ``tuned`` is the profile from ``R4C/database.py``.
+Pass ``--database-url`` to run both against another database, e.g. PostgreSQL, where only
+the connection reuse differs. Failed requests (e.g. ``database is locked``) are counted
+as errors.
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+PROFILES = {
+    'default': {'DB_SQLITE_TUNING': 'off', 'DB_CONN_MAX_AGE': '0'},
+    'tuned': {'DB_SQLITE_TUNING': 'on', 'DB_CONN_MAX_AGE': '60'},
+}
+
+
+def run_profile(args):
+    # Child process: the profile comes from the environment set by main()
+    import random
+
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'R4C.settings')
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connection, connections
+    from django.test import Client
+    from django.urls import reverse
+
+    from benchmarks.scenarios import post_json, robot_data, summarize
+    from robots.models import RobotSku
+
+    call_command('migrate', verbosity=0)
+    RobotSku.objects.get_or_create(model='R2', version='D2')
+    journal_mode = None
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+    connections.close_all()
+
+    rng = random.Random(args.seed)
+    payloads = []
+    for number in range(args.requests):
+        if number % 2:
+            payloads.append((reverse('create_order'), {
+                'customer_email': f'customer{rng.randrange(args.requests)}@example.com',
+                'robot_model': 'R2',
+                'robot_version': 'D2',
+            }))
+        else:
+            payloads.append((reverse('create_robot'), robot_data(rng, 'R2', 'D2')))
+
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies = []
+    errors = []
+
+    def worker():
+        client = Client(raise_request_exception=False)
+        try:
+            while True:
+                number = next(counter)
+                if number >= args.requests:
+                    return
+                url, data = payloads[number]
+                started = time.perf_counter()
+                response = post_json(client, url, data)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    if response.status_code >= 400:
+                        errors.append(number)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = summarize(latencies, time.perf_counter() - started, len(errors))
+    result['vendor'] = connection.vendor
+    result['journal_mode'] = journal_mode
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database-url', help='Run against this database instead of a fresh SQLite file.')
+    parser.add_argument('--profile', choices=PROFILES, action='append')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_profile(args)
+        return
+
+    results = {}
+    for name in args.profile or PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = args.database_url or f'sqlite:///{os.path.join(directory, "benchmark.sqlite3")}'
+            env = {**os.environ, **PROFILES[name], 'DATABASE_URL': database_url}
+            command = [
+                sys.executable, os.path.abspath(__file__), '--child',
+                '--threads', str(args.threads), '--requests', str(args.requests), '--seed', str(args.seed),
+            ]
+            output = subprocess.run(command, env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True)
+            results[name] = json.loads(output.stdout.strip().splitlines()[-1])
+            print(f'{name}: {json.dumps(results[name])}', file=sys.stderr)
+
+    if 'default' in results and 'tuned' in results:
+        results['speedup'] = round(results['tuned']['rps'] / results['default']['rps'], 2)
+    print(json.dumps({'threads': args.threads, 'requests': args.requests, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+HTTP load test comparing the WSGI and ASGI deployments of the ingestion and order endpoints.
+
+Start both deployments against the same database, e.g.:
+
+    gunicorn R4C.wsgi -w 4 --threads 8 -b 127.0.0.1:8000
+    uvicorn R4C.asgi:application --workers 4 --port 8001
+
+register the SKUs the test sends (every MODELS and VERSIONS pair):
+
+    python manage.py add_robot_skus R2-D2 R2-PO R2-LT R2-XS C3-D2 C3-PO C3-LT C3-XS \
+        X5-D2 X5-PO X5-LT X5-XS 13-D2 13-PO 13-LT 13-XS
+
+then run:
+
+    python benchmarks/load_test.py --wsgi http://127.0.0.1:8000 --asgi http://127.0.0.1:8001
+
+The WSGI deployment is exercised through the synchronous views and the ASGI deployment
+through their async variants. Requests/sec and latency percentiles are printed per scenario.
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+SCENARIOS = {
+    'create_robot': {
+        'wsgi': '/api/v1/robots/create_robot/',
+        'asgi': '/api/v1/robots/async/create_robot/',
+    },
+    'create_order': {
+        'wsgi': '/api/v1/orders/create/',
+        'asgi': '/api/v1/orders/async/create/',
+    },
+}
+MODELS = ['R2', 'C3', 'X5', '13']
+VERSIONS = ['D2', 'PO', 'LT', 'XS']
+
+
+def robot_payload(number):
+    created = datetime.now() - timedelta(minutes=1)
+    return {
+        'model': random.choice(MODELS),
+        'version': random.choice(VERSIONS),
+        'created': created.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def order_payload(number):
+    return {
+        'customer_email': f'load{number % 1000}@example.com',
+        'robot_model': random.choice(MODELS),
+        'robot_version': random.choice(VERSIONS),
+    }
+
+
+PAYLOADS = {'create_robot': robot_payload, 'create_order': order_payload}
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_scenario(base_url, path, payload, requests, concurrency):
+    """
+    Send ``requests`` POST requests with ``concurrency`` keep-alive connections.
+
+    Returns:
+        dict: Throughput, latency percentiles in milliseconds and the error count.
+    """
+    url = urlsplit(base_url)
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        connection = HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        try:
+            while True:
+                number = next(counter)
+                if number >= requests:
+                    return
+                body = json.dumps(payload(number))
+                started = time.perf_counter()
+                try:
+                    connection.request('POST', path, body, {'Content-Type': 'application/json'})
+                    response = connection.getresponse()
+                    response.read()
+                    failed = response.status >= 500
+                except OSError:
+                    connection.close()
+                    failed = True
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    if failed:
+                        errors.append(number)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'duration_s': round(duration, 3),
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wsgi', help='Base URL of the WSGI deployment.')
+    parser.add_argument('--asgi', help='Base URL of the ASGI deployment.')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    args = parser.parse_args()
+
+    deployments = {name: url for name, url in (('wsgi', args.wsgi), ('asgi', args.asgi)) if url}
+    if not deployments:
+        parser.error('pass --wsgi and/or --asgi')
+
+    results = []
+    for scenario in args.scenario or sorted(SCENARIOS):
+        for deployment, base_url in deployments.items():
+            result = run_scenario(
+                base_url, SCENARIOS[scenario][deployment], PAYLOADS[scenario], args.requests, args.concurrency
+            )
+            results.append({'scenario': scenario, 'deployment': deployment, **result})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'scenario':<14}{'deployment':<12}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for result in results:
+        print(
+            f"{result['scenario']:<14}{result['deployment']:<12}{result['rps']:>10}"
+            f"{result['p50_ms']:>10}{result['p99_ms']:>10}{result['errors']:>8}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Benchmark scenarios run by ``suite.py``.
+
+Each scenario takes the parsed suite arguments and the SMTP sink and returns a dict
+of measurements. Django has to be set up before this module is imported.
+"""
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.datagen import MODELS, VERSIONS, generate, serials
+from customers.models import Customer
+from orders.models import Order
+from orders.outbox import send_pending_emails
+from robots.ingestion import bulk_create_robots
+from robots.models import Robot, RobotSku
+from robots.stock import adjust_stock
+
+# SKUs outside the generated catalog, added by their scenarios, so they start from a known state
+CONCURRENT_SERIAL = ('Z9', 'Q1')
+BACKLOG_SERIAL = ('Z8', 'Q2')
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, duration, errors=0):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'duration_s': round(duration, 3),
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(max(latencies) * 1000, 3),
+    }
+
+
+def run_requests(send, requests, concurrency):
+    """
+    Call ``send(client, number)`` ``requests`` times from ``concurrency`` threads.
+
+    Every thread has its own test client and database connection. ``send`` returns
+    the response, which counts as an error for any status of 500 or above.
+
+    Returns:
+        dict: Throughput and latency percentiles in milliseconds.
+    """
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        client = Client()
+        try:
+            while True:
+                number = next(counter)
+                if number >= requests:
+                    return
+                started = time.perf_counter()
+                response = send(client, number)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    if response.status_code >= 500:
+                        errors.append(number)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, len(errors))
+
+
+def post_json(client, url, data):
+    return client.post(url, json.dumps(data), content_type='application/json')
+
+
+def robot_data(rng, model=None, version=None):
+    created = datetime.now() - timedelta(seconds=rng.uniform(60, 7 * 24 * 60 * 60))
+    return {
+        'model': model or rng.choice(MODELS),
+        'version': version or rng.choice(VERSIONS),
+        'created': created.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def prepare_database(args):
+    """
+    Migrate and fill the benchmark database, unless an existing one is reused.
+
+    Returns:
+        dict: The size of the data set and the time it took to generate.
+    """
+    call_command('migrate', verbosity=0)
+    if args.reuse and Robot.objects.exists():
+        return {'reused': True, 'robots': Robot.objects.count()}
+    started = time.perf_counter()
+    generated = generate(args.robots, args.customers, args.orders, seed=args.seed)
+    return {'reused': False, 'duration_s': round(time.perf_counter() - started, 3), **generated}
+
+
+def create_robot(args, sink):
+    url = reverse('create_robot')
+    rng = random.Random(args.seed)
+    payloads = [robot_data(rng) for _ in range(args.requests)]
+    return run_requests(lambda client, number: post_json(client, url, payloads[number]), args.requests, args.concurrency)
+
+
+def create_order(args, sink):
+    url = reverse('create_order')
+    rng = random.Random(args.seed)
+    catalog = serials()
+    payloads = []
+    for _ in range(args.requests):
+        model, version = rng.choice(catalog)
+        payloads.append({
+            'customer_email': f'customer{rng.randrange(max(args.customers, 1))}@example.com',
+            'robot_model': model,
+            'robot_version': version,
+        })
+    return run_requests(lambda client, number: post_json(client, url, payloads[number]), args.requests, args.concurrency)
+
+
+def robot_report_cold(args, sink):
+    # Every request renders the report; they run one at a time as each clears the shared cache
+    url = reverse('download_report')
+
+    def send(client, number):
+        cache.clear()
+        return client.get(url)
+
+    return run_requests(send, max(1, args.requests // 100), 1)
+
+
+def robot_report_warm(args, sink):
+    url = reverse('download_report')
+    return run_requests(lambda client, number: client.get(url), args.requests, args.concurrency)
+
+
+def concurrent_ordering(args, sink):
+    # Twice as many concurrent orders as robots in stock for one serial; every robot
+    # must end up in exactly one order
+    model, version = CONCURRENT_SERIAL
+    sku, _ = RobotSku.objects.get_or_create(model=model, version=version)
+    stock = max(1, args.requests // 2)
+    rng = random.Random(args.seed)
+    bulk_create_robots(enumerate((robot_data(rng, model, version) for _ in range(stock)), start=1))
+
+    url = reverse('create_order')
+    result = run_requests(
+        lambda client, number: post_json(client, url, {
+            'customer_email': f'concurrent{number}@example.com', 'robot_model': model, 'robot_version': version,
+        }),
+        stock * 2,
+        args.concurrency,
+    )
+
+    ready = Order.objects.filter(sku=sku, status='READY')
+    result['stock'] = stock
+    result['ready_orders'] = ready.count()
+    result['distinct_robots'] = ready.values('robot').distinct().count()
+    return result
+
+
+def backlog_notification(args, sink):
+    # One batch of robots fulfills a large backlog of waiting orders, then the outbox
+    # delivers one email per order to the SMTP sink
+    model, version = BACKLOG_SERIAL
+    sku, _ = RobotSku.objects.get_or_create(model=model, version=version)
+    customers = Customer.objects.bulk_create(
+        Customer(email=f'backlog{number}@example.com') for number in range(args.backlog)
+    )
+    Order.objects.bulk_create(
+        (Order(customer=customer, sku=sku, status='ROBOT_IS_OUT_OF_STOCK') for customer in customers),
+        batch_size=5000,
+    )
+    adjust_stock(sku.id, waiting=args.backlog)
+
+    rng = random.Random(args.seed)
+    body = '\n'.join(json.dumps(robot_data(rng, model, version)) for _ in range(args.backlog))
+    started = time.perf_counter()
+    response = Client().post(reverse('bulk_create_robots'), body, content_type='application/x-ndjson')
+    allocation = time.perf_counter() - started
+
+    received = sink.messages
+    started = time.perf_counter()
+    sent, failed = send_pending_emails()
+    delivery = time.perf_counter() - started
+
+    return {
+        'backlog': args.backlog,
+        'status': response.status_code,
+        'allocation_s': round(allocation, 3),
+        'ready_orders': Order.objects.filter(sku=sku, status='READY').count(),
+        'delivery_s': round(delivery, 3),
+        'emails_per_s': round(sent / delivery, 1),
+        'sent': sent,
+        'failed': failed,
+        'smtp_received': sink.messages - received,
+    }
+
+
+SCENARIOS = {
+    'create_robot': create_robot,
+    'create_order': create_order,
+    'robot_report_cold': robot_report_cold,
+    'robot_report_warm': robot_report_warm,
+    'concurrent_ordering': concurrent_ordering,
+    'backlog_notification': backlog_notification,
+}
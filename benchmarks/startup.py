@@ -0,0 +1,139 @@
+"""
+Cold start benchmark of a WSGI worker.
+
+Starts a fresh interpreter with ``-X importtime`` that loads the WSGI application and
+serves one request to ``/metrics/`` (no database access), and reports the time to the
+first response, the total import time and the modules that took longest to import.
+With ``--budget`` the script exits with status 1 when the time to the first response
+is over the budget, or when a module that is meant to be loaded on first use (the
+report workbook library, the SMTP backend) was imported during startup:
+
+    python benchmarks/startup.py --runs 5 --budget 1.5
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules only needed by reports and the outbox worker, which must not slow down startup
+LAZY_MODULES = ('openpyxl', 'smtplib', 'django.core.mail.backends')
+
+
+def serve_first_request():
+    # Runs in the child interpreter: load the application and serve one request
+    started = time.perf_counter()
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'R4C.settings')
+
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    loaded = time.perf_counter()
+
+    statuses = []
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': '/metrics/', 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+    }
+    body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+    served = time.perf_counter()
+
+    print(json.dumps({
+        'status': statuses[0],
+        'response_bytes': len(body),
+        'load_seconds': loaded - started,
+        'first_request_seconds': served - started,
+        'modules': sorted(sys.modules),
+    }))
+
+
+def parse_importtime(output):
+    """
+    Parse the ``-X importtime`` report written to stderr.
+
+    Args:
+        output (str): The stderr of the child interpreter.
+
+    Returns:
+        list: Tuples of the module name, self and cumulative import time in microseconds.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(own), int(cumulative)))
+    return imports
+
+
+def measure_startup():
+    """
+    Start one worker from scratch and measure it.
+
+    Returns:
+        dict: The time to the first response including interpreter startup, the time
+            spent in Django, the total import time, the lazy modules that were
+            imported anyway and the imports that took longest.
+    """
+    started = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--child'],
+        capture_output=True, text=True, cwd=BASE_DIR, check=True,
+    )
+    wall = time.perf_counter() - started
+
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(child.stderr)
+    modules = result.pop('modules')
+    result.update(
+        wall_seconds=wall,
+        import_seconds=sum(own for _, own, _ in imports) / 1e6,
+        eager_lazy_modules=[
+            lazy for lazy in LAZY_MODULES
+            if any(name == lazy or name.startswith(f'{lazy}.') for name in modules)
+        ],
+        slowest_imports=[
+            {'module': name, 'cumulative_ms': cumulative / 1e3}
+            for name, _, cumulative in sorted(imports, key=lambda item: item[2], reverse=True)[:15]
+        ],
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help='Cold starts, the fastest one is reported.')
+    parser.add_argument('--budget', type=float, help='Fail if the first response takes longer, in seconds.')
+    parser.add_argument('--json', action='store_true', help='Print the measurement as JSON.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        serve_first_request()
+        return
+
+    result = min((measure_startup() for _ in range(args.runs)), key=lambda run: run['wall_seconds'])
+    over_budget = args.budget is not None and (result['wall_seconds'] > args.budget or bool(result['eager_lazy_modules']))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"first response {result['status']} after {result['wall_seconds'] * 1e3:.0f} ms "
+              f"(Django {result['first_request_seconds'] * 1e3:.0f} ms, "
+              f"imports {result['import_seconds'] * 1e3:.0f} ms)")
+        print(f"{'module':<48}{'cumulative ms':>14}")
+        for item in result['slowest_imports']:
+            print(f"{item['module']:<48}{item['cumulative_ms']:>14.1f}")
+        if result['eager_lazy_modules']:
+            print(f"imported at startup: {', '.join(result['eager_lazy_modules'])}")
+        if args.budget is not None:
+            print(f"budget {args.budget * 1e3:.0f} ms: {'exceeded' if over_budget else 'met'}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
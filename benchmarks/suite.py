@@ -0,0 +1,107 @@
+"""
+Reproducible throughput and latency benchmarks for the robot and order endpoints.
+
+The suite builds a separate SQLite database, fills it with synthetic customers, robots
+and orders (see ``datagen.py``), and runs every scenario in ``scenarios.py`` in process
+through the Django test client, with a local SMTP sink in place of the mail server:
+
+    python benchmarks/suite.py --robots 1000000 --customers 100000 --orders 300000
+
+Results are written as JSON together with the run parameters and environment, so runs
+can be compared over time. ``--reuse`` keeps an already generated database between runs.
+For measurements against real WSGI/ASGI deployments see ``load_test.py``.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'R4C.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from benchmarks.smtp_sink import SMTPSink  # noqa: E402
+
+SCENARIO_NAMES = [
+    'create_robot', 'create_order', 'robot_report_cold', 'robot_report_warm',
+    'concurrent_ordering', 'backlog_notification',
+]
+
+
+def configure(database, smtp_port):
+    # Point Django at the benchmark database and the SMTP sink before it is set up
+    settings.DATABASES['default']['NAME'] = database
+    settings.DEBUG = False
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = '127.0.0.1'
+    settings.EMAIL_PORT = smtp_port
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = ''
+    settings.EMAIL_HOST_PASSWORD = ''
+    django.setup()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'r4c_benchmark.sqlite3'))
+    parser.add_argument('--reuse', action='store_true', help='Reuse a previously generated database.')
+    parser.add_argument('--robots', type=int, default=100_000)
+    parser.add_argument('--customers', type=int, default=10_000)
+    parser.add_argument('--orders', type=int, default=30_000)
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per throughput scenario.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--backlog', type=int, default=2000, help='Waiting orders in the notification scenario.')
+    parser.add_argument('--scenario', choices=SCENARIO_NAMES, action='append')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this JSON file instead of stdout.')
+    args = parser.parse_args()
+
+    if not args.reuse and os.path.exists(args.database):
+        os.remove(args.database)
+    sink = SMTPSink().start()
+    configure(args.database, sink.port)
+
+    from benchmarks import scenarios
+
+    run = {
+        'started': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'parameters': {key: value for key, value in vars(args).items() if key != 'output'},
+        'dataset': scenarios.prepare_database(args),
+        'results': {},
+    }
+    for name in args.scenario or SCENARIO_NAMES:
+        run['results'][name] = scenarios.SCENARIOS[name](args, sink)
+        print(f'{name}: {json.dumps(run["results"][name])}', file=sys.stderr)
+    sink.shutdown()
+
+    output = json.dumps(run, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
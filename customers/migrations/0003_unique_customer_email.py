@@ -0,0 +1,36 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:12
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_customers(apps, schema_editor):
+    # Move orders of duplicate customers to the oldest one with the same email
+    Customer = apps.get_model('customers', 'Customer')
+    Order = apps.get_model('orders', 'Order')
+    duplicates = (
+        Customer.objects.values('email')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        others = Customer.objects.filter(email=duplicate['email']).exclude(id=duplicate['first_id'])
+        Order.objects.filter(customer__in=others).update(customer_id=duplicate['first_id'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_alter_customer_id'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_customers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customer',
+            name='email',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
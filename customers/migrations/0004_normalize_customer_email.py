@@ -0,0 +1,37 @@
+# Generated by Django 4.2.5 on 2026-10-18 20:40
+
+from django.db import migrations
+
+
+def normalize_emails(apps, schema_editor):
+    # Lowercase the domain of every email, as customers.services.normalize_email does,
+    # merging customers that turn out to share an email into the oldest one
+    Customer = apps.get_model('customers', 'Customer')
+    Order = apps.get_model('orders', 'Order')
+    ArchivedOrder = apps.get_model('orders', 'ArchivedOrder')
+    for customer in Customer.objects.order_by('id').iterator():
+        local_part, separator, domain = customer.email.strip().rpartition('@')
+        email = f'{local_part}@{domain.lower()}' if separator else customer.email.strip()
+        if email == customer.email:
+            continue
+        first = Customer.objects.filter(email=email).exclude(id=customer.id).order_by('id').first()
+        if first is None:
+            Customer.objects.filter(id=customer.id).update(email=email)
+            continue
+        keep, drop = sorted((first, customer), key=lambda row: row.id)
+        for model_class in (Order, ArchivedOrder):
+            model_class.objects.filter(customer_id=drop.id).update(customer_id=keep.id)
+        Customer.objects.filter(id=drop.id).delete()
+        Customer.objects.filter(id=keep.id).update(email=email)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_unique_customer_email'),
+        ('orders', '0006_order_sku'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
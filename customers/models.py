@@ -2,7 +2,7 @@ from django.db import models
 
 
 class Customer(models.Model):
-    email = models.CharField(max_length=255,blank=False, null=False)
+    email = models.CharField(max_length=255, blank=False, null=False, unique=True)
 
     def __str__(self):
         return self.email
@@ -0,0 +1,158 @@
+import threading
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from customers.models import Customer
+
+CUSTOMER_CACHE_SIZE = getattr(settings, 'CUSTOMER_CACHE_SIZE', 10_000)
+
+
+class CustomerIdCache:
+    """
+    A bounded map of normalized emails to customer ids, evicting the least recently used entry.
+
+    Customers are never deleted by the order flow and emails never change, so an entry
+    stays valid for the life of the process.
+
+    Attributes:
+        maxsize (int): The maximum number of entries.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email):
+        with self._lock:
+            customer_id = self._ids.get(email)
+            if customer_id is not None:
+                self._ids.move_to_end(email)
+            return customer_id
+
+    def put(self, email, customer_id):
+        with self._lock:
+            self._ids[email] = customer_id
+            self._ids.move_to_end(email)
+            if len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def discard(self, email):
+        with self._lock:
+            self._ids.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+    def __len__(self):
+        return len(self._ids)
+
+
+customer_ids = CustomerIdCache(CUSTOMER_CACHE_SIZE)
+
+
+def normalize_email(email):
+    """
+    Normalize an email address for customer lookups.
+
+    Surrounding whitespace is removed and the domain part is lowercased; the local
+    part is kept as is, since mail servers may treat it as case sensitive.
+
+    Args:
+        email (str): The email address.
+
+    Returns:
+        str: The normalized email address.
+    """
+    local_part, separator, domain = email.strip().rpartition('@')
+    if not separator:
+        return email.strip()
+    return f'{local_part}@{domain.lower()}'
+
+
+def resolve_customer(email):
+    """
+    Get the id of the customer with the given email, creating the customer if needed.
+
+    Repeat customers are served from ``customer_ids`` without a query. Otherwise the
+    customer is selected, and inserted with ``ON CONFLICT DO NOTHING`` if missing, so
+    concurrent first orders with the same email end up with one customer instead of
+    failing on the unique constraint. The id is cached only once the current
+    transaction commits, so a rolled back insert never leaves a stale entry behind.
+
+    Args:
+        email (str): The customer's email address.
+
+    Returns:
+        int: The customer's id.
+    """
+    email = normalize_email(email)
+    customer_id = customer_ids.get(email)
+    if customer_id is not None:
+        return customer_id
+
+    customers = Customer.objects.filter(email=email).values_list('id', flat=True)
+    customer_id = customers.first()
+    if customer_id is None:
+        Customer.objects.bulk_create([Customer(email=email)], ignore_conflicts=True)
+        # Either our row or the one a concurrent request inserted first
+        customer_id = customers.first()
+    transaction.on_commit(lambda: customer_ids.put(email, customer_id))
+    return customer_id
+
+
+def resolve_customers(emails):
+    """
+    Get the ids of the customers with the given emails, creating missing customers.
+
+    The set-based counterpart of ``resolve_customer``: customers missing from
+    ``customer_ids`` are selected with one query and the ones still missing are
+    inserted with one ``INSERT ... ON CONFLICT DO NOTHING`` and selected again.
+
+    Args:
+        emails: An iterable of email addresses.
+
+    Returns:
+        dict: Customer ids by normalized email.
+    """
+    resolved = {}
+    missing = set()
+    for email in map(normalize_email, emails):
+        customer_id = customer_ids.get(email)
+        if customer_id is not None:
+            resolved[email] = customer_id
+        else:
+            missing.add(email)
+    if not missing:
+        return resolved
+
+    found = dict(Customer.objects.filter(email__in=missing).values_list('email', 'id'))
+    new = missing - found.keys()
+    if new:
+        Customer.objects.bulk_create([Customer(email=email) for email in new], ignore_conflicts=True)
+        found.update(Customer.objects.filter(email__in=new).values_list('email', 'id'))
+    transaction.on_commit(lambda: _cache_customer_ids(found))
+    resolved.update(found)
+    return resolved
+
+
+async def aresolve_customer(email):
+    """
+    Asynchronous version of ``resolve_customer``.
+
+    Cached customers are returned without leaving the event loop; only lookups and
+    inserts run in the thread used for the async ORM.
+    """
+    customer_id = customer_ids.get(normalize_email(email))
+    if customer_id is not None:
+        return customer_id
+    return await sync_to_async(resolve_customer)(email)
+
+
+def _cache_customer_ids(found):
+    for email, customer_id in found.items():
+        customer_ids.put(email, customer_id)
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from R4C.metrics import timed_receiver
+from customers.models import Customer
+from customers.services import customer_ids
+
+
+@receiver(post_delete, sender=Customer)
+@timed_receiver
+def forget_deleted_customer(sender, instance, **kwargs):
+    """
+    Custom signal receiver to drop a customer deleted outside of the order flow (e.g. in the admin)
+    from the cached email to id map.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The deleted instance of the Customer model.
+        kwargs: Additional keyword arguments.
+    """
+    customer_ids.discard(instance.email)
@@ -1,3 +1,87 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from .models import Customer
+from .services import CustomerIdCache, customer_ids, normalize_email, resolve_customer
+
+
+class CustomerResolutionTest(TestCase):
+    def setUp(self):
+        customer_ids.clear()
+        self.addCleanup(customer_ids.clear)
+
+    def test_email_is_normalized(self):
+        self.assertEqual(normalize_email(" John.Doe@Example.COM "), "John.Doe@example.com")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = resolve_customer("John.Doe@Example.COM")
+        second = resolve_customer("John.Doe@example.com")
+
+        self.assertEqual(first, second)
+        self.assertEqual(Customer.objects.get().email, "John.Doe@example.com")
+
+    def test_repeat_customer_costs_no_query(self):
+        existing = Customer.objects.create(email="customer@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(resolve_customer("customer@example.com"), existing.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_customer("customer@example.com"), existing.id)
+
+    def test_rolled_back_customer_is_not_cached(self):
+        # The commit callback is dropped, as it is when the transaction rolls back
+        with self.captureOnCommitCallbacks(execute=False):
+            resolve_customer("customer@example.com")
+
+        self.assertEqual(len(customer_ids), 0)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = CustomerIdCache(maxsize=2)
+        cache.put("a@example.com", 1)
+        cache.put("b@example.com", 2)
+        cache.get("a@example.com")
+        cache.put("c@example.com", 3)
+
+        self.assertEqual(cache.get("a@example.com"), 1)
+        self.assertIsNone(cache.get("b@example.com"))
+        self.assertEqual(len(cache), 2)
+
+    def test_deleted_customer_is_forgotten(self):
+        customer = Customer.objects.create(email="customer@example.com")
+        customer_ids.put(customer.email, customer.id)
+
+        customer.delete()
+
+        self.assertIsNone(customer_ids.get("customer@example.com"))
+
+
+class ConcurrentCustomerResolutionTest(TransactionTestCase):
+    threads = 8
+
+    def resolve(self, barrier, results, errors):
+        try:
+            barrier.wait()
+            results.append(resolve_customer("customer@example.com"))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_concurrent_first_orders_share_a_customer(self):
+        self.addCleanup(customer_ids.clear)
+        barrier = threading.Barrier(self.threads)
+        results, errors = [], []
+
+        threads = [
+            threading.Thread(target=self.resolve, args=(barrier, results, errors)) for _ in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Customer.objects.count(), 1)
+        self.assertEqual(set(results), {Customer.objects.get().id})
@@ -1,9 +1,22 @@
 from django.contrib import admin
-from .models import Order
 
+from R4C.admin import LargeTableAdmin
+from .models import Order, OutgoingEmail
 
-class OrderAdmin(admin.ModelAdmin):
-    list_display = ('customer', 'robot_serial')
+
+class OrderAdmin(LargeTableAdmin):
+    list_display = ('id', 'customer', 'sku', 'status')
+    list_select_related = ('customer', 'sku')
+    list_filter = ('status', 'sku')
+    raw_id_fields = ('customer', 'robot')
 
 
 admin.site.register(Order, OrderAdmin)
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'next_attempt', 'sent')
+    list_filter = ('status',)
+
+
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -0,0 +1,105 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.dispatch import Signal
+
+from orders.models import Order
+from orders.notifications import build_availability_email
+from orders.outbox import enqueue_emails
+from robots.models import Robot
+from robots.stock import adjust_stock
+
+# Sent once the transaction that allocated robots has been committed.
+# Receivers get the orders that became ready as ``orders``.
+orders_ready = Signal()
+
+
+def allocate_robots(robots):
+    """
+    Assign newly produced robots to the oldest waiting orders for their SKU.
+
+    Each robot goes to at most one order, first come first served. Orders and robots
+    are updated with set-based queries and notification emails are queued with one
+    batched insert, so a production batch costs the same number of queries however
+    many orders are waiting. The chosen orders are locked and re-checked before they
+    are updated, so concurrent allocations never fulfill an order twice; the robot of
+    an order taken meanwhile goes to the next waiting order in line, or stays in
+    stock when there is none. The stock counters of each SKU
+    are moved by the number of fulfilled orders. ``orders_ready`` is sent after the
+    transaction commits.
+
+    Args:
+        robots: An iterable of created Robot instances.
+
+    Returns:
+        list: The orders that became ready.
+    """
+    available = {}
+    for robot in robots:
+        if not robot.ordered:
+            available.setdefault(robot.sku_id, []).append(robot)
+    if not available:
+        return []
+
+    with transaction.atomic():
+        waiting_orders = (
+            Order.objects.filter(sku_id__in=available, status='ROBOT_IS_OUT_OF_STOCK')
+            .annotate(position=Window(RowNumber(), partition_by=F('sku_id'), order_by=F('id').asc()))
+            .filter(position__lte=max(len(sku_robots) for sku_robots in available.values()))
+            .select_related('customer')
+            .order_by('id')
+        )
+        candidates = [order for order in waiting_orders if order.position <= len(available[order.sku_id])]
+        if not candidates:
+            return []
+
+        # Lock the candidates and re-check them, as a concurrent allocation may have
+        # fulfilled or be fulfilling some of them; robots go to the orders that remain
+        claimed = set(
+            Order.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=[order.id for order in candidates], status='ROBOT_IS_OUT_OF_STOCK')
+            .values_list('pk', flat=True)
+        )
+        ready_orders = []
+        skipped_skus = set()
+        for order in candidates:
+            if order.id not in claimed:
+                skipped_skus.add(order.sku_id)
+                continue
+            order.robot = available[order.sku_id].pop(0)
+            order.status = 'READY'
+            ready_orders.append(order)
+
+        # Robots left by skipped candidates go to the next orders in line, which are
+        # locked directly; this costs a query per affected SKU only when it happens
+        considered = [order.id for order in candidates]
+        for sku_id in skipped_skus:
+            robots_left = available[sku_id]
+            if not robots_left:
+                continue
+            next_orders = (
+                Order.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(sku_id=sku_id, status='ROBOT_IS_OUT_OF_STOCK')
+                .exclude(pk__in=considered)
+                .select_related('customer')
+                .order_by('id')[:len(robots_left)]
+            )
+            for order in next_orders:
+                order.robot = robots_left.pop(0)
+                order.status = 'READY'
+                ready_orders.append(order)
+        if not ready_orders:
+            return []
+
+        Robot.objects.filter(pk__in=[order.robot_id for order in ready_orders]).update(ordered=True)
+        Order.objects.bulk_update(ready_orders, ['robot', 'status'])
+        enqueue_emails([build_availability_email(order) for order in ready_orders])
+        for sku_id, count in Counter(order.sku_id for order in ready_orders).items():
+            adjust_stock(sku_id, available=-count, waiting=-count)
+        transaction.on_commit(lambda: orders_ready.send(sender=Order, orders=ready_orders))
+
+    for order in ready_orders:
+        order.robot.ordered = True
+    return ready_orders
@@ -0,0 +1,147 @@
+"""
+In-process publish/subscribe of order status changes for long-polling and SSE clients.
+
+Subscribers wait on an asyncio queue of the event loop serving them, while status
+changes are published from whatever thread committed them, so a waiting client costs
+no database queries until its order changes. The hub only sees changes made in its
+own process: waiting views re-read the status from the database once per
+``ORDER_EVENTS_RECHECK_INTERVAL`` to pick up changes made by other workers.
+"""
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from orders.models import Order
+from robots.catalog import get_sku_by_id
+
+ORDER_STATUS_MAX_WAIT = getattr(settings, 'ORDER_STATUS_MAX_WAIT', 60)
+ORDER_EVENTS_RECHECK_INTERVAL = getattr(settings, 'ORDER_EVENTS_RECHECK_INTERVAL', 30)
+ORDER_EVENTS_MAX_DURATION = getattr(settings, 'ORDER_EVENTS_MAX_DURATION', 5 * 60)
+# Orders in these statuses do not change any more, so their streams end
+FINAL_ORDER_STATUSES = ('READY',)
+
+
+class Subscription:
+    """
+    Status changes of one order, delivered to the event loop that subscribed.
+
+    Use it as a context manager, so it is removed from the hub when the client is done.
+
+    Attributes:
+        order_id (int): The id of the watched order.
+    """
+
+    def __init__(self, hub, order_id):
+        self.order_id = order_id
+        self._hub = hub
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+    def deliver(self, event):
+        # Called from any thread
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except RuntimeError:
+            # The event loop of the subscriber is already closed
+            pass
+
+    async def get(self, timeout):
+        """
+        Wait for the next status change.
+
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            dict | None: The new order status, or None if the order did not change in time.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class OrderStatusHub:
+    """A registry of subscriptions by order id, published to from any thread."""
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, order_id):
+        # Must be called from the event loop the changes are awaited on
+        subscription = Subscription(self, order_id)
+        with self._lock:
+            self._subscriptions.setdefault(order_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.order_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.order_id]
+
+    def publish(self, event):
+        """
+        Hand a status change to everyone watching the order.
+
+        Args:
+            event (dict): The order status, as returned by ``order_status``.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event['id'], ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+order_status_hub = OrderStatusHub()
+
+
+def order_status(order_id, sku_id, status):
+    # The public status of an order, with the model and version from the SKU catalog
+    sku = get_sku_by_id(sku_id)
+    return {'id': order_id, 'model': sku.model, 'version': sku.version, 'status': status}
+
+
+def get_order_status(order_id):
+    """
+    Read the status of an order from the database.
+
+    Args:
+        order_id (int): The order id.
+
+    Returns:
+        dict | None: The order status, or None if there is no such order.
+    """
+    row = Order.objects.filter(pk=order_id).values_list('sku_id', 'status').first()
+    if row is None:
+        return None
+    return order_status(order_id, *row)
+
+
+async def aget_order_status(order_id):
+    # Asynchronous version of ``get_order_status``; the catalog may have to be loaded
+    return await sync_to_async(get_order_status)(order_id)
+
+
+def publish_orders(orders):
+    # Publish the current status of changed orders
+    for order in orders:
+        order_status_hub.publish(order_status(order.id, order.sku_id, order.status))
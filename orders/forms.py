@@ -1,8 +1,7 @@
 from django import forms
 
-from customers.models import Customer
-from orders.models import Order
-from robots.models import Robot
+from orders.placement import aplace_order, place_order
+from robots.catalog import validate_sku
 from robots.validators import validate_model_version
 
 
@@ -19,55 +18,45 @@ class OrderCreateForm(forms.Form):
         robot_version (CharField): The version of the robot.
 
     Methods:
+        clean(): Checks that the robot's model and version exist in the SKU catalog.
+
         save_custom_order(): Validates the form data and creates a new order for the customer if a robot
         with the specified model and version is available in the stock.
 
-        generate_robot_serial(model, version): Generates a unique robot serial based on the model and version.
+        asave_robot_order(): Asynchronous version of save_robot_order() for async views.
     """
 
     customer_email = forms.EmailField(max_length=255, label='Customer Email')
     robot_model = forms.CharField(max_length=2, validators=[validate_model_version], label='Robot Model')
     robot_version = forms.CharField(max_length=2, validators=[validate_model_version], label='Robot Version')
 
+    def clean(self):
+        """
+        Check that the robot's model and version exist in the SKU catalog.
+        """
+        cleaned_data = super().clean()
+        if 'robot_model' in cleaned_data and 'robot_version' in cleaned_data:
+            validate_sku(cleaned_data['robot_model'], cleaned_data['robot_version'])
+        return cleaned_data
+
     def save_robot_order(self):
         """
         Create a new robot order for the customer.
 
         This method validates the form data and creates a new order for the customer if a robot with the specified
         model and version is available in the stock. It also updates the robot's status to 'READY' if the robot is
-        available, or 'NO_ROBOT_IN_STOCK' if it's not.
+        available, or 'NO_ROBOT_IN_STOCK' if it's not. See ``orders.placement.place_order``.
 
         Returns:
             None
         """
+        place_order(**self.cleaned_data)
 
-        customer_email = self.cleaned_data['customer_email']
-        robot_model = self.cleaned_data['robot_model']
-        robot_version = self.cleaned_data['robot_version']
-        robot_serial = self.generate_robot_serial(robot_model, robot_version)
-        customer, created = Customer.objects.get_or_create(email=customer_email)
-        robot = Robot.objects.filter(serial=robot_serial, ordered=False).first()
-
-        if robot:
-            robot.ordered = True
-            robot.save()
-            order_status = 'READY'
-        else:
-            order_status = 'ROBOT_IS_OUT_OF_STOCK'
-
-        order = Order(customer=customer, robot_serial=robot_serial, status=order_status)
-        order.save()
-
-    @staticmethod
-    def generate_robot_serial(model, version):
+    async def asave_robot_order(self):
         """
-        Generate a robot serial based on model and version.
-
-        Args:
-            model (str): The robot's model.
-            version (str): The robot's version.
+        Asynchronous version of ``save_robot_order`` for async views.
 
         Returns:
-            str: The generated robot serial.
+            None
         """
-        return f"{model}-{version}"
+        await aplace_order(**self.cleaned_data)
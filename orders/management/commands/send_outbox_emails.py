@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from R4C.metrics import start_metrics_server
+from orders.outbox import OUTBOX_BATCH_SIZE, send_pending_emails
+
+
+class Command(BaseCommand):
+    help = 'Deliver emails queued in the outbox in batches over one reused mail connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=OUTBOX_BATCH_SIZE,
+            help='Number of emails claimed and sent per batch.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting once it is empty.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait between polls in --loop mode.',
+        )
+        parser.add_argument(
+            '--metrics-port', type=int,
+            help='Serve the email send metrics in the Prometheus text format on this port.',
+        )
+        parser.add_argument(
+            '--metrics-host', default='127.0.0.1',
+            help='Address the metrics server listens on, local only by default.',
+        )
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            start_metrics_server(options['metrics_port'], options['metrics_host'])
+        while True:
+            sent, failed = send_pending_emails(options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed.')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('customers', '0002_alter_customer_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('robot_serial', models.CharField(max_length=5)),
+                ('status', models.CharField(choices=[('CREATED', 'created'), ('ROBOT_IS_OUT_OF_STOCK', 'robot_is_out_of_stock'), ('READY', 'ready')], default='CREATED', max_length=64)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='customers.customer')),
+            ],
+        ),
+    ]
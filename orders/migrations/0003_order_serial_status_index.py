@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['robot_serial', 'status'], name='order_serial_status_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0003_hot_query_indexes'),
+        ('orders', '0003_order_serial_status_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='robot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='robots.robot'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0005_archived_robot'),
+        ('customers', '0003_unique_customer_email'),
+        ('orders', '0004_order_robot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('robot_serial', models.CharField(max_length=5)),
+                ('status', models.CharField(choices=[('CREATED', 'created'), ('ROBOT_IS_OUT_OF_STOCK', 'robot_is_out_of_stock'), ('READY', 'ready')], max_length=64)),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='customers.customer')),
+                ('robot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='robots.archivedrobot')),
+            ],
+        ),
+    ]
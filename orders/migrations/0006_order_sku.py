@@ -0,0 +1,82 @@
+# Generated by Django 4.2.5 on 2026-10-18 20:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_order_skus(apps, schema_editor):
+    # robots.0006 created an SKU for every serial ordered so far
+    RobotSku = apps.get_model('robots', 'RobotSku')
+    Order = apps.get_model('orders', 'Order')
+    ArchivedOrder = apps.get_model('orders', 'ArchivedOrder')
+    for sku in RobotSku.objects.all():
+        for model_class in (Order, ArchivedOrder):
+            model_class.objects.filter(robot_serial=f'{sku.model}-{sku.version}').update(sku=sku)
+
+
+def restore_robot_serials(apps, schema_editor):
+    RobotSku = apps.get_model('robots', 'RobotSku')
+    Order = apps.get_model('orders', 'Order')
+    ArchivedOrder = apps.get_model('orders', 'ArchivedOrder')
+    for sku in RobotSku.objects.all():
+        for model_class in (Order, ArchivedOrder):
+            model_class.objects.filter(sku=sku).update(robot_serial=f'{sku.model}-{sku.version}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0006_robot_sku'),
+        ('orders', '0005_archived_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='sku',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='orders', to='robots.robotsku'),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='sku',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to='robots.robotsku'),
+        ),
+        # The old columns become nullable first, so the migration can be reversed
+        migrations.AlterField(
+            model_name='order',
+            name='robot_serial',
+            field=models.CharField(max_length=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedorder',
+            name='robot_serial',
+            field=models.CharField(max_length=5, null=True),
+        ),
+        migrations.RunPython(set_order_skus, restore_robot_serials),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_serial_status_idx',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='robot_serial',
+        ),
+        migrations.RemoveField(
+            model_name='archivedorder',
+            name='robot_serial',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='orders', to='robots.robotsku'),
+        ),
+        migrations.AlterField(
+            model_name='archivedorder',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to='robots.robotsku'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['sku', 'status'], name='order_sku_status_idx'),
+        ),
+    ]
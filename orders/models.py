@@ -1,10 +1,51 @@
 from django.db import models
+from django.utils import timezone
 
-from orders.utils import ORDER_STATUS
+from orders.utils import EMAIL_STATUS, ORDER_STATUS
 from customers.models import Customer
+from robots.models import ArchivedRobot, Robot, RobotSku
 
 
 class Order(models.Model):
     customer = models.ForeignKey(Customer,on_delete=models.CASCADE)
-    robot_serial = models.CharField(max_length=5,blank=False, null=False)
+    sku = models.ForeignKey(RobotSku, on_delete=models.PROTECT, related_name='orders')
+    robot = models.ForeignKey(Robot, on_delete=models.SET_NULL, blank=True, null=True)
     status = models.CharField(choices=ORDER_STATUS, default='CREATED', max_length=64,)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sku', 'status'], name='order_sku_status_idx'),
+            # The status filter of the admin changelist
+            models.Index(fields=['status'], name='order_status_idx'),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """A fulfilled order moved out of the orders table by ``archive_history``, keeping its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    sku = models.ForeignKey(RobotSku, on_delete=models.PROTECT, related_name='archived_orders')
+    robot = models.ForeignKey(ArchivedRobot, on_delete=models.SET_NULL, blank=True, null=True)
+    status = models.CharField(choices=ORDER_STATUS, max_length=64)
+    archived = models.DateTimeField(auto_now_add=True)
+
+
+class OutgoingEmail(models.Model):
+    """An email waiting in the outbox to be delivered by the ``send_outbox_emails`` worker."""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True, null=True)
+    recipient = models.CharField(max_length=255)
+    status = models.CharField(choices=EMAIL_STATUS, default='PENDING', max_length=16)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    claim = models.CharField(max_length=32, blank=True, null=True, db_index=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt'], name='outgoing_email_due_idx'),
+        ]
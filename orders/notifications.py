@@ -0,0 +1,26 @@
+from django.conf import settings
+
+from orders.models import OutgoingEmail
+from robots.catalog import get_sku_by_id
+
+
+def build_availability_email(order):
+    """
+    Build the outbox email telling a customer that the robot they ordered is in stock.
+
+    Args:
+        order (Order): The order, with its customer loaded.
+
+    Returns:
+        OutgoingEmail: The unsaved outbox email.
+    """
+    subject = 'Robot in stock'
+    sku = get_sku_by_id(order.sku_id)
+    model, version = sku.model, sku.version
+    message = f"""
+            Добрый день!
+            Недавно вы интересовались нашим роботом модели {model}, версии {version}. 
+            Этот робот теперь в наличии. Если вам подходит этот вариант - пожалуйста, свяжитесь с нами
+            """
+    from_email = settings.EMAIL_HOST_USER
+    return OutgoingEmail(subject=subject, body=message, from_email=from_email, recipient=order.customer.email)
@@ -0,0 +1,169 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from R4C.metrics import EMAIL_SEND_DURATION
+from orders.models import OutgoingEmail
+
+OUTBOX_BATCH_SIZE = getattr(settings, 'OUTBOX_BATCH_SIZE', 100)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+OUTBOX_RETRY_DELAY = getattr(settings, 'OUTBOX_RETRY_DELAY', 60)
+OUTBOX_LEASE = getattr(settings, 'OUTBOX_LEASE', 5 * 60)
+
+
+def enqueue_email(subject, message, from_email, recipient_list):
+    """
+    Put an email into the outbox instead of sending it right away.
+
+    The row is written in the caller's transaction, so the email is only delivered
+    if the change that triggered it is committed.
+
+    Args:
+        subject (str): The email subject.
+        message (str): The email body.
+        from_email (str): The sender address.
+        recipient_list (list): The recipient addresses, one outbox row is created per recipient.
+
+    Returns:
+        list: The created OutgoingEmail instances.
+    """
+    return OutgoingEmail.objects.bulk_create([
+        OutgoingEmail(subject=subject, body=message, from_email=from_email, recipient=recipient)
+        for recipient in recipient_list
+    ])
+
+
+def enqueue_emails(emails):
+    """
+    Put several prepared outbox emails into the outbox with one batched insert.
+
+    Args:
+        emails (list): Unsaved OutgoingEmail instances.
+
+    Returns:
+        list: The created OutgoingEmail instances.
+    """
+    return OutgoingEmail.objects.bulk_create(emails)
+
+
+def claim_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Claim a batch of due emails for delivery.
+
+    Rows are claimed with a single conditional UPDATE tagged with a unique token, so
+    concurrent workers never claim the same row. Rows claimed by a worker that died
+    become claimable again once their lease expires.
+
+    Args:
+        batch_size (int): The maximum number of emails to claim.
+
+    Returns:
+        list: The claimed OutgoingEmail instances.
+    """
+    now = timezone.now()
+    claimable = Q(status='PENDING', next_attempt__lte=now) | Q(status='SENDING', locked_until__lt=now)
+    ids = list(
+        OutgoingEmail.objects.filter(claimable)
+        .order_by('next_attempt')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    OutgoingEmail.objects.filter(claimable, id__in=ids).update(
+        status='SENDING', locked_until=now + timedelta(seconds=OUTBOX_LEASE), claim=token
+    )
+    return list(OutgoingEmail.objects.filter(claim=token, status='SENDING'))
+
+
+def deliver_batch(emails, connection=None):
+    """
+    Send claimed emails over one reused mail connection and record the outcome.
+
+    Failed emails are rescheduled with exponential backoff, and marked as failed once
+    they run out of attempts.
+
+    Args:
+        emails (list): The claimed OutgoingEmail instances.
+        connection: An optional mail backend connection, ``get_connection()`` is used by default.
+
+    Returns:
+        tuple: The number of sent and failed emails.
+    """
+    if not emails:
+        return 0, 0
+
+    # Imported on first use, so only the outbox worker pays for the mail modules
+    from django.core.mail import EmailMessage, get_connection
+
+    connection = connection or get_connection()
+    sent_ids = []
+    failures = []
+
+    try:
+        connection.open()
+    except Exception as e:
+        failures = [(email, e) for email in emails]
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, [email.recipient], connection=connection
+                )
+                started = time.perf_counter()
+                try:
+                    connection.send_messages([message])
+                    sent_ids.append(email.id)
+                    EMAIL_SEND_DURATION.observe(time.perf_counter() - started, 'sent')
+                except Exception as e:
+                    failures.append((email, e))
+                    EMAIL_SEND_DURATION.observe(time.perf_counter() - started, 'failed')
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    OutgoingEmail.objects.filter(id__in=sent_ids).update(
+        status='SENT', sent=now, attempts=F('attempts') + 1, locked_until=None, claim=None, last_error=''
+    )
+    for email, error in failures:
+        attempts = email.attempts + 1
+        email.attempts = attempts
+        email.last_error = str(error)
+        email.locked_until = None
+        email.claim = None
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            email.status = 'FAILED'
+        else:
+            email.status = 'PENDING'
+            email.next_attempt = now + timedelta(seconds=OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+    OutgoingEmail.objects.bulk_update(
+        [email for email, error in failures],
+        ['attempts', 'last_error', 'locked_until', 'claim', 'status', 'next_attempt'],
+    )
+
+    return len(sent_ids), len(failures)
+
+
+def send_pending_emails(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Deliver all due emails in batches.
+
+    Args:
+        batch_size (int): The number of emails claimed and sent per batch.
+
+    Returns:
+        tuple: The number of sent and failed emails.
+    """
+    sent = failed = 0
+    while True:
+        emails = claim_batch(batch_size)
+        if not emails:
+            return sent, failed
+        batch_sent, batch_failed = deliver_batch(emails)
+        sent += batch_sent
+        failed += batch_failed
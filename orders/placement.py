@@ -0,0 +1,97 @@
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from customers.services import normalize_email, resolve_customer, resolve_customers
+from orders.models import Order
+from robots.catalog import get_sku
+from robots.stock import adjust_stock, claim_robots, reserve_robot
+
+
+def place_order(customer_email, robot_model, robot_version):
+    """
+    Create a robot order for the customer, reserving a robot if one is in stock.
+
+    The robot is reserved with ``reserve_robot``, so concurrent orders never get the same robot,
+    and no robot is looked up at all when the stock counter says the SKU is out of stock.
+    The model and version must exist in the SKU catalog, as checked by ``OrderCreateForm``.
+    The customer is resolved with ``resolve_customer`` before the transaction, so a repeat
+    customer costs no query at all.
+    The order is 'READY' if a robot was reserved, or 'ROBOT_IS_OUT_OF_STOCK' if not.
+
+    Args:
+        customer_email (str): The customer's email address.
+        robot_model (str): The model of the robot.
+        robot_version (str): The version of the robot.
+
+    Returns:
+        Order: The created order.
+    """
+    sku = get_sku(robot_model, robot_version)
+    customer_id = resolve_customer(customer_email)
+
+    with transaction.atomic():
+        # Claim the robot first, so the transaction starts with a write
+        robot_id = reserve_robot(sku.id)
+        if robot_id is not None:
+            order_status = 'READY'
+        else:
+            order_status = 'ROBOT_IS_OUT_OF_STOCK'
+
+        order = Order(customer_id=customer_id, sku=sku, robot_id=robot_id, status=order_status)
+        order.save()
+    return order
+
+
+def place_orders(lines):
+    """
+    Create robot orders for a batch of lines, reserving robots that are in stock.
+
+    The set-based counterpart of ``place_order``: customers are resolved with
+    ``resolve_customers`` before the transaction, then robots are claimed with one
+    ``claim_robots`` call per SKU, orders are written with one batched insert and the
+    stock counters of each SKU are moved once. Within an SKU, robots go to the lines
+    in the order they were sent. As ``bulk_create`` does not send ``post_save``,
+    waiting orders are counted here rather than by ``count_waiting_order``.
+
+    Args:
+        lines: A list of dicts with ``customer_email``, ``robot_model`` and
+            ``robot_version``, as cleaned by ``ORDER_SCHEMA``.
+
+    Returns:
+        list: The created orders, in the order of the lines.
+    """
+    skus = [get_sku(line['robot_model'], line['robot_version']) for line in lines]
+    customers = resolve_customers(line['customer_email'] for line in lines)
+    demand = Counter(sku.id for sku in skus)
+
+    with transaction.atomic():
+        # Claim the robots first, so the transaction starts with a write
+        claimed = {sku_id: claim_robots(sku_id, count) for sku_id, count in demand.items()}
+        orders = []
+        for line, sku in zip(lines, skus):
+            robot_ids = claimed[sku.id]
+            robot_id = robot_ids.pop(0) if robot_ids else None
+            orders.append(Order(
+                customer_id=customers[normalize_email(line['customer_email'])],
+                sku=sku,
+                robot_id=robot_id,
+                status='READY' if robot_id is not None else 'ROBOT_IS_OUT_OF_STOCK',
+            ))
+        orders = Order.objects.bulk_create(orders)
+
+        waiting = Counter(order.sku_id for order in orders if order.robot_id is None)
+        for sku_id, count in demand.items():
+            adjust_stock(sku_id, available=-(count - waiting[sku_id]), waiting=waiting[sku_id])
+    return orders
+
+
+async def aplace_order(customer_email, robot_model, robot_version):
+    """
+    Asynchronous version of ``place_order`` for async views.
+
+    The order is placed in the thread used for the async ORM, as the async ORM cannot
+    wrap the robot claim, the counter update and the order insert in one transaction.
+    """
+    return await sync_to_async(place_order)(customer_email, robot_model, robot_version)
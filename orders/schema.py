@@ -0,0 +1,18 @@
+from robots.catalog import validate_sku
+from robots.schema import CharField, EmailField, Schema
+from robots.validators import validate_model_version
+
+
+def check_order_sku(cleaned_data):
+    # Same as OrderCreateForm.clean(): the ordered model and version must exist in the catalog
+    if 'robot_model' in cleaned_data and 'robot_version' in cleaned_data:
+        validate_sku(cleaned_data['robot_model'], cleaned_data['robot_version'])
+
+
+# Same fields and rules as OrderCreateForm
+ORDER_SCHEMA = Schema(
+    checks=[check_order_sku],
+    customer_email=EmailField(max_length=255),
+    robot_model=CharField(max_length=2, validators=[validate_model_version]),
+    robot_version=CharField(max_length=2, validators=[validate_model_version]),
+)
@@ -1,51 +1,94 @@
-from django.core.mail import send_mail
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.http import JsonResponse
 
-from R4C import settings
+from R4C.metrics import timed_receiver
+from orders.allocation import allocate_robots, orders_ready
+from orders.events import publish_orders
 from orders.models import Order
-
 from robots.models import Robot
+from robots.signals import robots_created
+from robots.stock import adjust_stock
 
 
 @receiver(post_save, sender=Robot)
+@timed_receiver
 def update_robot_availability(sender, instance, created, **kwargs):
     """
-    Custom signal receiver to notify customers when a robot becomes available.
+    Custom signal receiver to hand a newly created robot to the oldest waiting order.
+
+    The customer is notified through the email outbox, delivered by the
+    ``send_outbox_emails`` worker, so robot creation never waits on SMTP.
 
     Args:
         sender: The sender of the signal.
         instance: The instance of the Robot model that triggered the signal.
         created: A boolean indicating whether the instance was just created.
         kwargs: Additional keyword arguments.
-
-    Returns:
-        JsonResponse: A JSON response indicating the result of the notification process.
     """
     if created:
-        orders_with_robot = Order.objects.filter(
-            robot_serial=instance.serial, status='ROBOT_IS_OUT_OF_STOCK'
-        )
-
-        for order in orders_with_robot:
-            notify_customer_about_robot_availability(order)
-
-
-def notify_customer_about_robot_availability(order):
-    subject = 'Robot in stock'
-    model, version = order.robot_serial.split('-')
-    message = f"""
-            Добрый день!
-            Недавно вы интересовались нашим роботом модели {model}, версии {version}. 
-            Этот робот теперь в наличии. Если вам подходит этот вариант - пожалуйста, свяжитесь с нами
-            """
-    from_email = settings.EMAIL_HOST_USER
-    recipient_list = [order.customer.email]
-    order.status = 'READY'
-    order.save()
-
-    try:
-        send_mail(subject, message, from_email, recipient_list)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
\ No newline at end of file
+        allocate_robots([instance])
+
+
+@receiver(robots_created, sender=Robot)
+@timed_receiver
+def update_bulk_robot_availability(sender, robots, **kwargs):
+    """
+    Custom signal receiver to hand robots created in bulk to the oldest waiting orders.
+
+    ``bulk_create`` does not send ``post_save``, so this mirrors ``update_robot_availability``
+    for a whole batch.
+
+    Args:
+        sender: The sender of the signal.
+        robots: The list of created Robot instances.
+        kwargs: Additional keyword arguments.
+    """
+    allocate_robots(robots)
+
+
+@receiver(post_save, sender=Order)
+@timed_receiver
+def count_waiting_order(sender, instance, created, **kwargs):
+    """
+    Custom signal receiver to count a new order that is waiting for a robot in the stock counters.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The instance of the Order model that triggered the signal.
+        created: A boolean indicating whether the instance was just created.
+        kwargs: Additional keyword arguments.
+    """
+    if created and instance.status == 'ROBOT_IS_OUT_OF_STOCK':
+        adjust_stock(instance.sku_id, waiting=1)
+
+
+@receiver(post_delete, sender=Order)
+@timed_receiver
+def discard_waiting_order(sender, instance, **kwargs):
+    """
+    Custom signal receiver to keep the stock counters in sync when a waiting order is deleted.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The deleted instance of the Order model.
+        kwargs: Additional keyword arguments.
+    """
+    if instance.status == 'ROBOT_IS_OUT_OF_STOCK':
+        adjust_stock(instance.sku_id, waiting=-1)
+
+
+@receiver(orders_ready, sender=Order)
+@timed_receiver
+def announce_ready_orders(sender, orders, **kwargs):
+    """
+    Custom signal receiver to push orders that got a robot to clients waiting on their status.
+
+    ``orders_ready`` is sent once the allocation is committed, so clients never see
+    a status that could still be rolled back.
+
+    Args:
+        sender: The sender of the signal.
+        orders: The list of Order instances that became ready.
+        kwargs: Additional keyword arguments.
+    """
+    publish_orders(orders)
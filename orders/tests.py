@@ -1,11 +1,36 @@
+import asyncio
+from datetime import timedelta
+import io
+import json
+import threading
+from unittest import skipUnless
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import Count
 from django.utils import timezone
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-import json
 
-from orders.models import Order
-from robots.models import Robot
+from R4C.metrics import EMAIL_SEND_DURATION
+from orders.allocation import allocate_robots, orders_ready
+from orders.events import order_status_hub
+from orders.forms import OrderCreateForm
+from orders.models import Order, OutgoingEmail
+from orders.schema import ORDER_SCHEMA
+from orders.outbox import OUTBOX_MAX_ATTEMPTS, claim_batch, send_pending_emails
+from orders.placement import aplace_order
+from robots.catalog import catalog
+from robots.models import DailyProduction, Robot, RobotSku
+from robots.stock import claim_robot, claim_robots, get_stock, rebuild_stock_counters
 from customers.models import Customer
+from customers.services import customer_ids
 from .signals import update_robot_availability
 
 ORDER_DATA = {
@@ -16,6 +41,9 @@ ORDER_DATA = {
 
 
 class OrderCreateViewTest(TestCase):
+    def setUp(self):
+        self.sku = RobotSku.objects.create(model="R2", version="D2")
+
     def test_valid_order_creation(self):
         # Send a POST request to the view
         response = self.client.post(reverse("create_order"), json.dumps(ORDER_DATA), content_type="application/json")
@@ -44,9 +72,27 @@ class OrderCreateViewTest(TestCase):
         # Check that no new order is created in the database
         self.assertEqual(Order.objects.count(), 0)
 
+    def test_repeat_orders_share_a_customer(self):
+        self.client.post(reverse("create_order"), json.dumps(ORDER_DATA), content_type="application/json")
+        repeat_data = {**ORDER_DATA, "customer_email": "customer@EXAMPLE.com"}
+        self.client.post(reverse("create_order"), json.dumps(repeat_data), content_type="application/json")
+
+        self.assertEqual(Customer.objects.count(), 1)
+        self.assertEqual(Order.objects.filter(customer__email="customer@example.com").count(), 2)
+
+    def test_unknown_sku_order(self):
+        # A well-formed model and version that are not in the catalog
+        order_data = {**ORDER_DATA, "robot_model": "X5", "robot_version": "LT"}
+
+        response = self.client.post(reverse("create_order"), json.dumps(order_data), content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], {"__all__": ["Unknown robot model and version."]})
+        self.assertEqual(Order.objects.count(), 0)
+
     def test_order_creation_with_existing_robot(self):
         # Create a robot in the database
-        robot = Robot.objects.create(serial="R2-D2", model="R2", version="D2", created=timezone.now())
+        robot = Robot.objects.create(sku=self.sku, created=timezone.now())
 
         # Send a POST request to the view
         response = self.client.post(reverse("create_order"), json.dumps(ORDER_DATA), content_type="application/json")
@@ -75,21 +121,602 @@ class OrderCreateViewTest(TestCase):
         self.assertEqual(Robot.objects.count(), 0)
 
 
+class OrderBatchCreateViewTest(TestCase):
+    def setUp(self):
+        self.sku = RobotSku.objects.create(model="R2", version="D2")
+        RobotSku.objects.create(model="X5", version="LT")
+        self.robots = [Robot.objects.create(sku=self.sku, created=timezone.now()) for _ in range(2)]
+
+    def post(self, lines):
+        return self.client.post(reverse("create_orders"), json.dumps(lines), content_type="application/json")
+
+    def test_batch_reserves_robots_in_line_order(self):
+        lines = [
+            ORDER_DATA,
+            {**ORDER_DATA, "robot_model": "X5", "robot_version": "LT"},
+            {**ORDER_DATA, "customer_email": "reseller@example.com"},
+            {**ORDER_DATA, "customer_email": "invalid_email"},
+            {**ORDER_DATA, "customer_email": "customer@EXAMPLE.com"},
+        ]
+
+        response = self.post(lines)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["orders"]
+        self.assertEqual([result.get("status") for result in results], [
+            "READY", "ROBOT_IS_OUT_OF_STOCK", "READY", None, "ROBOT_IS_OUT_OF_STOCK",
+        ])
+        self.assertIn("customer_email", results[3]["errors"])
+        # The first two R2-D2 lines got the two robots, oldest first
+        ready = Order.objects.filter(status="READY").order_by("id")
+        self.assertEqual([order.robot_id for order in ready], [robot.id for robot in self.robots])
+        self.assertEqual(Customer.objects.count(), 2)
+        self.assertEqual(get_stock(), [
+            {"serial": "R2-D2", "available": 0, "waiting": 1},
+            {"serial": "X5-LT", "available": 0, "waiting": 1},
+        ])
+
+    def test_query_count_does_not_grow_with_lines(self):
+        def lines(count):
+            return [{**ORDER_DATA, "customer_email": f"customer{number}@example.com"} for number in range(count)]
+        catalog.get_by_id(self.sku.id)
+
+        with CaptureQueriesContext(connection) as small:
+            self.post(lines(5))
+        with CaptureQueriesContext(connection) as large:
+            self.post(lines(50))
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Order.objects.count(), 55)
+
+    def test_invalid_batches(self):
+        self.assertEqual(self.post(ORDER_DATA).status_code, 400)
+        self.assertEqual(self.post([ORDER_DATA] * 501).status_code, 400)
+        self.assertEqual(Order.objects.count(), 0)
+
+
+class OrderAdminTest(TestCase):
+    def setUp(self):
+        self.sku = RobotSku.objects.create(model="R2", version="D2")
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+
+    def create_orders(self, numbers):
+        customers = Customer.objects.bulk_create(Customer(email=f"customer{number}@example.com") for number in numbers)
+        Order.objects.bulk_create(
+            Order(customer=customer, sku=self.sku, status="ROBOT_IS_OUT_OF_STOCK") for customer in customers
+        )
+
+    def test_customers_do_not_add_queries_per_row(self):
+        self.create_orders(range(10))
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse("admin:orders_order_changelist"), {"status__exact": "ROBOT_IS_OUT_OF_STOCK"})
+        self.create_orders(range(10, 100))
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(
+                reverse("admin:orders_order_changelist"), {"status__exact": "ROBOT_IS_OUT_OF_STOCK"}
+            )
+
+        self.assertContains(response, "customer99@example.com")
+        self.assertEqual(len(small), len(large))
+
+
 class RobotAvailabilitySignalTest(TestCase):
     def test_signal_handler(self):
         customer = Customer.objects.create(email='test@example.com')
         robot = Robot.objects.create(
-            serial='M1-V2',
-            model='M1',
-            version='V2',
+            sku=RobotSku.objects.create(model='M1', version='V2'),
             created=timezone.now(),
             ordered=False
         )
         order = Order.objects.create(
             customer=customer,
-            robot_serial=robot.serial,
+            sku=robot.sku,
             status='ROBOT_IS_OUT_OF_STOCK'
         )
         update_robot_availability(sender=Robot, instance=robot, created=True)
         order.refresh_from_db()
         self.assertEqual(order.status, 'READY')
+
+    def test_bulk_created_robots_notify_waiting_orders(self):
+        customer = Customer.objects.create(email='test@example.com')
+        order = Order.objects.create(
+            customer=customer,
+            sku=RobotSku.objects.create(model='R2', version='D2'),
+            status='ROBOT_IS_OUT_OF_STOCK'
+        )
+        body = json.dumps([{"model": "R2", "version": "D2", "created": "2023-01-01 00:00:01"}])
+
+        self.client.post(reverse("bulk_create_robots"), body, content_type="application/json")
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'READY')
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('SMTP server is unavailable')
+
+
+class EmailOutboxTest(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email='test@example.com')
+        self.sku = RobotSku.objects.create(model='R2', version='D2')
+        for _ in range(3):
+            Order.objects.create(customer=self.customer, sku=self.sku, status='ROBOT_IS_OUT_OF_STOCK')
+
+    def create_robots(self):
+        for _ in range(3):
+            Robot.objects.create(sku=self.sku, created=timezone.now())
+
+    def test_signal_queues_emails_instead_of_sending(self):
+        self.create_robots()
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.filter(status='PENDING').count(), 3)
+        email = OutgoingEmail.objects.first()
+        self.assertEqual(email.recipient, 'test@example.com')
+        self.assertIn('модели R2, версии D2', email.body)
+
+    @override_settings(EMAIL_BACKEND='orders.tests.CountingEmailBackend')
+    def test_worker_sends_batch_over_one_connection(self):
+        self.create_robots()
+        CountingEmailBackend.opened = 0
+
+        call_command('send_outbox_emails', stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(OutgoingEmail.objects.filter(status='SENT').count(), 3)
+
+    def test_send_time_is_recorded_per_outcome(self):
+        self.create_robots()
+        EMAIL_SEND_DURATION.clear()
+
+        send_pending_emails()
+
+        self.assertEqual(EMAIL_SEND_DURATION.get_count('sent'), 3)
+        self.assertEqual(EMAIL_SEND_DURATION.get_count('failed'), 0)
+
+    @override_settings(EMAIL_BACKEND='orders.tests.FailingEmailBackend')
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.create_robots()
+
+        sent, failed = send_pending_emails()
+
+        self.assertEqual((sent, failed), (0, 3))
+        email = OutgoingEmail.objects.first()
+        self.assertEqual(email.status, 'PENDING')
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt, timezone.now())
+        self.assertIn('SMTP server is unavailable', email.last_error)
+
+        # Rescheduled emails are not claimed again before their next attempt
+        self.assertEqual(send_pending_emails(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND='orders.tests.FailingEmailBackend')
+    def test_email_fails_after_max_attempts(self):
+        self.create_robots()
+
+        for _ in range(OUTBOX_MAX_ATTEMPTS):
+            OutgoingEmail.objects.update(next_attempt=timezone.now())
+            send_pending_emails()
+
+        self.assertEqual(OutgoingEmail.objects.filter(status='FAILED').count(), 3)
+
+    def test_expired_claim_is_claimed_again(self):
+        self.create_robots()
+        claim_batch()
+        self.assertEqual(claim_batch(), [])
+
+        OutgoingEmail.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(len(claim_batch()), 3)
+
+
+class ConcurrentOrderTest(TransactionTestCase):
+    threads = 16
+    robots_in_stock = 5
+
+    def setUp(self):
+        self.sku = RobotSku.objects.create(model='R2', version='D2')
+        self.addCleanup(customer_ids.clear)
+
+    def place_order(self, barrier, number, errors):
+        try:
+            form = OrderCreateForm({
+                'customer_email': f'customer{number}@example.com',
+                'robot_model': 'R2',
+                'robot_version': 'D2',
+            })
+            self.assertTrue(form.is_valid())
+            barrier.wait()
+            form.save_robot_order()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_concurrent_orders_never_share_a_robot(self):
+        for _ in range(self.robots_in_stock):
+            Robot.objects.create(sku=self.sku, created=timezone.now())
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        threads = [
+            threading.Thread(target=self.place_order, args=(barrier, number, errors))
+            for number in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Order.objects.count(), self.threads)
+        self.assertEqual(Order.objects.filter(status='READY').count(), self.robots_in_stock)
+        self.assertEqual(Robot.objects.filter(ordered=True).count(), self.robots_in_stock)
+
+    def test_claim_robot_reports_success(self):
+        robot = Robot.objects.create(sku=self.sku, created=timezone.now())
+
+        self.assertEqual(claim_robot(self.sku.id), robot.id)
+        self.assertIsNone(claim_robot(self.sku.id))
+
+    def test_claim_robots_stops_when_stock_runs_out(self):
+        robots = [Robot.objects.create(sku=self.sku, created=timezone.now()) for _ in range(3)]
+
+        self.assertEqual(claim_robots(self.sku.id, 2), [robot.id for robot in robots[:2]])
+        self.assertEqual(claim_robots(self.sku.id, 2), [robots[2].id])
+        self.assertEqual(claim_robots(self.sku.id, 2), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked with SQLite EXPLAIN QUERY PLAN')
+class QueryPlanTest(TestCase):
+    """
+    Check that every hot query is answered through an index rather than a full table scan.
+
+    The tables are seeded with a realistic spread of rows and analyzed, so the planner
+    picks plans based on statistics instead of defaults.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        skus = RobotSku.objects.bulk_create(
+            RobotSku(model=f'M{m}', version=f'V{v}') for m in range(10) for v in range(10)
+        )
+        cls.sku = skus[11]
+        Robot.objects.bulk_create(
+            Robot(sku=sku, created=now - timedelta(minutes=number), ordered=number % 3 == 0)
+            for number, sku in enumerate(skus * 200)
+        )
+        customers = Customer.objects.bulk_create(
+            Customer(email=f'customer{number}@example.com') for number in range(2000)
+        )
+        Order.objects.bulk_create(
+            Order(
+                customer=customer, sku=skus[number % len(skus)],
+                status='READY' if number % 4 else 'ROBOT_IS_OUT_OF_STOCK',
+            )
+            for number, customer in enumerate(customers * 5)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, table):
+        plan = queryset.explain()
+        self.assertIn(f'SEARCH {table} USING', plan)
+        self.assertNotRegex(plan, rf'SCAN {table}$|SCAN {table}\n')
+
+    def test_robot_claim_uses_index(self):
+        available = Robot.objects.filter(sku=self.sku, ordered=False).order_by('id').values('id')[:1]
+        self.assertUsesIndex(available, 'robots_robot')
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', available.explain())
+
+    def test_report_partial_day_uses_index(self):
+        since = timezone.now() - timedelta(days=7)
+        robots = (
+            Robot.objects.filter(created__gte=since, created__lt=since + timedelta(hours=1))
+            .values('sku_id')
+            .annotate(count=Count('id'))
+        )
+        self.assertUsesIndex(robots, 'robots_robot')
+
+    def test_report_rollup_uses_index(self):
+        rollup = DailyProduction.objects.filter(day__gt=timezone.localdate()).values('sku_id')
+        self.assertUsesIndex(rollup, 'robots_dailyproduction')
+
+    def test_waiting_orders_lookup_uses_index(self):
+        orders = Order.objects.filter(sku=self.sku, status='ROBOT_IS_OUT_OF_STOCK')
+        self.assertUsesIndex(orders, 'orders_order')
+
+    def test_customer_lookup_uses_index(self):
+        customers = Customer.objects.filter(email='customer1@example.com')
+        self.assertUsesIndex(customers, 'customers_customer')
+
+    def test_outbox_claim_uses_index(self):
+        emails = OutgoingEmail.objects.filter(status='PENDING', next_attempt__lte=timezone.now())
+        self.assertUsesIndex(emails, 'orders_outgoingemail')
+
+
+class RobotAllocationTest(TestCase):
+    def setUp(self):
+        self.skus = {
+            'R2-D2': RobotSku.objects.create(model='R2', version='D2'),
+            'X5-LT': RobotSku.objects.create(model='X5', version='LT'),
+        }
+
+    def create_waiting_orders(self, count, serial='R2-D2'):
+        customers = Customer.objects.bulk_create(
+            Customer(email=f'{serial}-{number}@example.com') for number in range(count)
+        )
+        orders = Order.objects.bulk_create(
+            Order(customer=customer, sku=self.skus[serial], status='ROBOT_IS_OUT_OF_STOCK') for customer in customers
+        )
+        # bulk_create skips the receivers maintaining the stock counters
+        rebuild_stock_counters()
+        return orders
+
+    def create_robots(self, count, serial='R2-D2'):
+        robots = Robot.objects.bulk_create(
+            Robot(sku=self.skus[serial], created=timezone.now()) for _ in range(count)
+        )
+        rebuild_stock_counters()
+        return robots
+
+    def test_robot_goes_to_oldest_waiting_order(self):
+        first, second = self.create_waiting_orders(2)
+        robot = Robot.objects.create(sku=self.skus['R2-D2'], created=timezone.now())
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        robot.refresh_from_db()
+        self.assertEqual((first.status, first.robot_id), ('READY', robot.id))
+        self.assertEqual((second.status, second.robot_id), ('ROBOT_IS_OUT_OF_STOCK', None))
+        self.assertTrue(robot.ordered)
+        self.assertEqual(OutgoingEmail.objects.get().recipient, first.customer.email)
+
+    def test_batch_is_allocated_per_sku_in_order(self):
+        r2_orders = self.create_waiting_orders(3)
+        x5_orders = self.create_waiting_orders(1, serial='X5-LT')
+        robots = self.create_robots(2) + self.create_robots(2, serial='X5-LT')
+
+        ready_orders = allocate_robots(robots)
+
+        self.assertEqual(
+            sorted(order.id for order in ready_orders),
+            [r2_orders[0].id, r2_orders[1].id, x5_orders[0].id],
+        )
+        self.assertEqual(Order.objects.filter(status='READY').count(), 3)
+        # The spare X5-LT robot stays in stock
+        self.assertEqual(Robot.objects.filter(ordered=False).count(), 1)
+        self.assertEqual(Order.objects.filter(robot__isnull=False).values('robot').distinct().count(), 3)
+        # Allocated robots leave the stock and their orders stop waiting
+        self.assertEqual(get_stock(), [
+            {'serial': 'R2-D2', 'available': 0, 'waiting': 1},
+            {'serial': 'X5-LT', 'available': 1, 'waiting': 0},
+        ])
+
+    def test_allocation_query_count_does_not_grow_with_backlog(self):
+        self.create_waiting_orders(60)
+        small_batch = self.create_robots(5)
+        large_batch = self.create_robots(50)
+        # Load the SKU catalog up front, the notifications read it
+        catalog.get_by_id(self.skus['R2-D2'].id)
+
+        with CaptureQueriesContext(connection) as small:
+            allocate_robots(small_batch)
+        with CaptureQueriesContext(connection) as large:
+            allocate_robots(large_batch)
+
+        self.assertEqual(len(small), len(large))
+
+    def test_order_fulfilled_concurrently_is_skipped(self):
+        first, second = self.create_waiting_orders(2)
+        robots = self.create_robots(2)
+
+        def fulfill_first_after_selection(execute, sql, params, many, context):
+            # Another worker fulfills the oldest order between the selection and the lock
+            result = execute(sql, params, many, context)
+            if 'ROW_NUMBER' in sql:
+                Order.objects.filter(pk=first.pk).update(status='READY')
+            return result
+
+        with connection.execute_wrapper(fulfill_first_after_selection):
+            ready_orders = allocate_robots(robots)
+
+        self.assertEqual([order.id for order in ready_orders], [second.id])
+        self.assertEqual(Robot.objects.filter(ordered=True).count(), 1)
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+        # The robot of the taken order stays in stock
+        self.assertEqual(get_stock()[0]['available'], 1)
+
+    def test_robot_of_skipped_order_goes_to_the_next_in_line(self):
+        first, second, third = self.create_waiting_orders(3)
+        robots = self.create_robots(2)
+
+        def fulfill_first_after_selection(execute, sql, params, many, context):
+            # Another worker fulfills the oldest order between the selection and the lock
+            result = execute(sql, params, many, context)
+            if 'ROW_NUMBER' in sql:
+                Order.objects.filter(pk=first.pk).update(status='READY')
+            return result
+
+        with connection.execute_wrapper(fulfill_first_after_selection):
+            ready_orders = allocate_robots(robots)
+
+        self.assertEqual([order.id for order in ready_orders], [second.id, third.id])
+        self.assertEqual(Robot.objects.filter(ordered=True).count(), 2)
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+        self.assertEqual(get_stock()[0]['available'], 0)
+
+    def test_ready_orders_are_announced_after_commit(self):
+        self.create_waiting_orders(1)
+        received = []
+        orders_ready.connect(lambda sender, orders, **kwargs: received.extend(orders), weak=False, dispatch_uid='test')
+        self.addCleanup(orders_ready.disconnect, dispatch_uid='test')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            allocate_robots(self.create_robots(1))
+        self.assertEqual(received, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(received), 1)
+
+
+class AsyncOrderCreateViewTest(TestCase):
+    def setUp(self):
+        self.sku = RobotSku.objects.create(model="R2", version="D2")
+
+    async def test_order_creation_with_existing_robot(self):
+        robot = await Robot.objects.acreate(sku=self.sku, created=timezone.now())
+
+        response = await self.async_client.post(
+            reverse("async_create_order"), json.dumps(ORDER_DATA), content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        order = await Order.objects.aget()
+        self.assertEqual((order.status, order.robot_id), ('READY', robot.id))
+        await robot.arefresh_from_db()
+        self.assertTrue(robot.ordered)
+
+    async def test_order_creation_with_non_existing_robot(self):
+        response = await self.async_client.post(
+            reverse("async_create_order"), json.dumps(ORDER_DATA), content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        order = await Order.objects.select_related('customer').aget()
+        self.assertEqual(order.status, 'ROBOT_IS_OUT_OF_STOCK')
+        self.assertEqual(order.customer.email, ORDER_DATA['customer_email'])
+
+    async def test_failed_order_insert_releases_the_robot(self):
+        robot = await Robot.objects.acreate(sku=self.sku, created=timezone.now())
+
+        with patch.object(Order, 'save', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                await aplace_order(**ORDER_DATA)
+
+        await robot.arefresh_from_db()
+        self.assertFalse(robot.ordered)
+        self.assertEqual(await sync_to_async(get_stock)(), [{'serial': 'R2-D2', 'available': 1, 'waiting': 0}])
+
+
+class OrderStatusTest(TestCase):
+    def setUp(self):
+        self.sku = RobotSku.objects.create(model="R2", version="D2")
+        customer = Customer.objects.create(email="customer@example.com")
+        self.order = Order.objects.create(customer=customer, sku=self.sku, status="ROBOT_IS_OUT_OF_STOCK")
+
+    def fulfill(self):
+        # Give the order a robot the way allocation does, announcing it once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            allocate_robots([Robot.objects.create(sku=self.sku, created=timezone.now())])
+
+    async def wait_for_subscribers(self, count, timeout=5):
+        async def subscribed():
+            while len(order_status_hub) < count:
+                await asyncio.sleep(0.01)
+
+        try:
+            await asyncio.wait_for(subscribed(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.fail(f"{count} subscriber(s) expected within {timeout} s, got {len(order_status_hub)}")
+
+    def test_status_lookup(self):
+        response = self.client.get(reverse("order_status", args=[self.order.id]))
+
+        self.assertEqual(response.json(), {
+            "id": self.order.id, "model": "R2", "version": "D2", "status": "ROBOT_IS_OUT_OF_STOCK",
+        })
+        self.assertEqual(self.client.get(reverse("order_status", args=[self.order.id + 1])).status_code, 404)
+
+    async def test_long_poll_returns_on_change(self):
+        url = reverse("order_status", args=[self.order.id])
+        request = asyncio.ensure_future(self.async_client.get(url, {"wait": 10, "status": "ROBOT_IS_OUT_OF_STOCK"}))
+        await self.wait_for_subscribers(1)
+
+        started = asyncio.get_running_loop().time()
+        await sync_to_async(self.fulfill)()
+        response = await request
+
+        self.assertEqual(response.json()["status"], "READY")
+        self.assertLess(asyncio.get_running_loop().time() - started, 5)
+        self.assertEqual(len(order_status_hub), 0)
+
+    async def test_long_poll_times_out_with_current_status(self):
+        url = reverse("order_status", args=[self.order.id])
+
+        response = await self.async_client.get(url, {"wait": 0.05, "status": "ROBOT_IS_OUT_OF_STOCK"})
+
+        self.assertEqual(response.json()["status"], "ROBOT_IS_OUT_OF_STOCK")
+
+    def test_non_finite_wait_is_rejected(self):
+        url = reverse("order_status", args=[self.order.id])
+
+        for wait in ("nan", "inf", "-inf"):
+            with self.subTest(wait=wait):
+                response = self.client.get(url, {"wait": wait, "status": "ROBOT_IS_OUT_OF_STOCK"})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "wait must be a number of seconds"})
+
+    async def test_event_stream(self):
+        response = await self.async_client.get(reverse("order_events", args=[self.order.id]))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = response.streaming_content
+
+        first = await anext(events)
+        self.assertIn(b'"status": "ROBOT_IS_OUT_OF_STOCK"', first)
+        await sync_to_async(self.fulfill)()
+        second = await anext(events)
+
+        self.assertTrue(second.startswith(b"event: status\ndata: "))
+        self.assertIn(b'"status": "READY"', second)
+        # The stream ends once the order is ready
+        with self.assertRaises(StopAsyncIteration):
+            await anext(events)
+        self.assertEqual(len(order_status_hub), 0)
+
+    async def test_unread_event_stream_leaves_no_subscription(self):
+        response = await self.async_client.get(reverse("order_events", args=[self.order.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(order_status_hub), 0)
+
+
+class OrderSchemaTest(TestCase):
+    payloads = [
+        ORDER_DATA,
+        {"customer_email": " Customer@Example.com ", "robot_model": "13", "robot_version": "XS"},
+        {"customer_email": "invalid_email", "robot_model": "R 2", "robot_version": "D2D2"},
+        {"customer_email": "a" * 250 + "@example.com", "robot_model": "", "robot_version": None},
+        {"customer_email": "customer@example.com", "robot_model": "X5", "robot_version": "LT"},
+        {"customer_email": "invalid_email", "robot_model": "X5", "robot_version": "LT"},
+        {},
+    ]
+
+    def setUp(self):
+        RobotSku.objects.create(model="R2", version="D2")
+        RobotSku.objects.create(model="13", version="XS")
+
+    def test_schema_matches_form(self):
+        for payload in self.payloads:
+            with self.subTest(payload=payload):
+                form = OrderCreateForm(payload)
+                form.is_valid()
+
+                cleaned_data, errors = ORDER_SCHEMA.validate(payload)
+
+                self.assertEqual(json.dumps(errors), json.dumps(form.errors))
+                if not errors:
+                    self.assertEqual(cleaned_data, form.cleaned_data)
@@ -1,7 +1,11 @@
 from django.urls import path
 
-from .views import OrderCreateView
+from .views import AsyncOrderCreateView, OrderBatchCreateView, OrderCreateView, OrderEventsView, OrderStatusView
 
 urlpatterns = [
-    path('create/', OrderCreateView.as_view(), name='create_order')
+    path('create/', OrderCreateView.as_view(), name='create_order'),
+    path('create_batch/', OrderBatchCreateView.as_view(), name='create_orders'),
+    path('async/create/', AsyncOrderCreateView.as_view(), name='async_create_order'),
+    path('<int:order_id>/', OrderStatusView.as_view(), name='order_status'),
+    path('<int:order_id>/events/', OrderEventsView.as_view(), name='order_events'),
 ]
\ No newline at end of file
@@ -3,3 +3,10 @@ ORDER_STATUS = [
     ('ROBOT_IS_OUT_OF_STOCK', 'robot_is_out_of_stock'),
     ('READY', 'ready'),
 ]
+
+EMAIL_STATUS = [
+    ('PENDING', 'pending'),
+    ('SENDING', 'sending'),
+    ('SENT', 'sent'),
+    ('FAILED', 'failed'),
+]
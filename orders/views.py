@@ -1,11 +1,21 @@
+import asyncio
 import json
+import math
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
-from orders.forms import OrderCreateForm
+from orders.events import (
+    FINAL_ORDER_STATUSES, ORDER_EVENTS_MAX_DURATION, ORDER_EVENTS_RECHECK_INTERVAL, ORDER_STATUS_MAX_WAIT,
+    aget_order_status, order_status_hub,
+)
+from orders.placement import aplace_order, place_order, place_orders
+from orders.schema import ORDER_SCHEMA
+
+ORDER_BATCH_MAX_LINES = getattr(settings, 'ORDER_BATCH_MAX_LINES', 500)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -14,7 +24,7 @@ class OrderCreateView(View):
     A custom view for creating robot orders.
 
     This view allows customers to place orders for robots by providing their email address, the robot's model,
-    and the robot's version in a JSON payload.
+    and the robot's version in a JSON payload, validated with ``ORDER_SCHEMA`` (the ``OrderCreateForm`` rules).
 
     Methods:
         post(request, *args, **kwargs): Handles the POST request to create a new robot order.
@@ -22,11 +32,165 @@ class OrderCreateView(View):
 
     def post(self, request, *args, **kwargs):
         try:
-            data = json.loads(request.body.decode('utf-8'))
-            form = OrderCreateForm(data)
-            if not form.is_valid():
-                return JsonResponse({'errors': form.errors}, status=400)
-            form.save_robot_order()
+            data = json.loads(request.body)
+            if not isinstance(data, dict):
+                return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+            cleaned_data, errors = ORDER_SCHEMA.validate(data)
+            if errors:
+                return JsonResponse({'errors': errors}, status=400)
+            place_order(**cleaned_data)
             return JsonResponse({'message': 'Order successfully created.'})
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
\ No newline at end of file
+            return JsonResponse({'error': str(e)}, status=400)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class OrderBatchCreateView(View):
+    """
+    View for placing many robot orders at once.
+
+    Accepts a POST request with a JSON array of up to ``ORDER_BATCH_MAX_LINES`` lines,
+    each with the fields of ``OrderCreateView``. Valid lines are placed together with
+    ``place_orders`` in one transaction; invalid lines are skipped. The response has
+    one entry per line, in order, with the 1-based line number and either the order
+    status or the validation errors.
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+        if not isinstance(data, list):
+            return JsonResponse({'error': 'Expected a JSON array of orders'}, status=400)
+        if len(data) > ORDER_BATCH_MAX_LINES:
+            return JsonResponse({'error': f'At most {ORDER_BATCH_MAX_LINES} orders per request'}, status=400)
+
+        results = []
+        valid = []
+        for line, line_data in enumerate(data, start=1):
+            if not isinstance(line_data, dict):
+                results.append({'line': line, 'error': 'Invalid JSON data'})
+                continue
+            cleaned_data, errors = ORDER_SCHEMA.validate(line_data)
+            if errors:
+                results.append({'line': line, 'errors': errors})
+            else:
+                result = {'line': line}
+                results.append(result)
+                valid.append((result, cleaned_data))
+
+        if valid:
+            orders = place_orders([cleaned_data for _, cleaned_data in valid])
+            for (result, _), order in zip(valid, orders):
+                result['status'] = order.status
+        return JsonResponse({'orders': results})
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncOrderCreateView(View):
+    """
+    Asynchronous version of ``OrderCreateView`` for ASGI deployments.
+
+    The customer, the robot reservation and the order are handled with the async ORM,
+    so no blocking work is done on the event loop.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            if not isinstance(data, dict):
+                return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+            cleaned_data, errors = await ORDER_SCHEMA.avalidate(data)
+            if errors:
+                return JsonResponse({'errors': errors}, status=400)
+            await aplace_order(**cleaned_data)
+            return JsonResponse({'message': 'Order successfully created.'})
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+
+class OrderStatusView(View):
+    """
+    View for the status of an order, with optional long polling.
+
+    Accepts a GET request and returns the order's id, model, version and status.
+    With ``wait=<seconds>`` (at most ``ORDER_STATUS_MAX_WAIT``) and ``status=<known status>``,
+    the response is held until the status differs from the known one or the time runs out,
+    waiting on ``order_status_hub`` rather than querying the database meanwhile.
+    Returns 404 if there is no such order.
+
+    Orders are looked up by their sequential id without authentication, like the rest of
+    the API, so anyone can read the model, version and status of any order; no customer
+    data is returned.
+    """
+
+    async def get(self, request, order_id):
+        try:
+            wait = float(request.GET.get('wait', 0))
+            # nan and inf would slip through the clamp below and wait forever
+            if not math.isfinite(wait):
+                raise ValueError
+        except ValueError:
+            return JsonResponse({'error': 'wait must be a number of seconds'}, status=400)
+        wait = min(max(wait, 0), ORDER_STATUS_MAX_WAIT)
+
+        # Subscribe before reading, so a change committed in between is not missed
+        with order_status_hub.subscribe(order_id) as subscription:
+            status = await aget_order_status(order_id)
+            if status is None:
+                return JsonResponse({'error': 'Order not found'}, status=404)
+            if wait and status['status'] == request.GET.get('status'):
+                status = await subscription.get(wait) or await aget_order_status(order_id) or status
+        return JsonResponse(status)
+
+
+class OrderEventsView(View):
+    """
+    View streaming the status changes of an order as Server-Sent Events.
+
+    Sends a ``status`` event with the current status right away and another one on every
+    change pushed through ``order_status_hub``, checking the database once per
+    ``ORDER_EVENTS_RECHECK_INTERVAL`` for changes made by other processes and sending a
+    comment line to keep the connection open. The stream ends once the order is ready, or
+    after ``ORDER_EVENTS_MAX_DURATION`` seconds, when clients reconnect as usual for SSE.
+    Meant for the ASGI deployment, where a waiting stream holds no thread.
+    Returns 404 if there is no such order.
+    """
+
+    async def get(self, request, order_id):
+        status = await aget_order_status(order_id)
+        if status is None:
+            return JsonResponse({'error': 'Order not found'}, status=404)
+
+        response = StreamingHttpResponse(self.stream(order_id, status), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Keep nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    async def stream(order_id, status):
+        # Subscribe only once the stream is iterated, so a response that is never sent
+        # leaves no subscription behind; re-read the status, as it may have changed since
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ORDER_EVENTS_MAX_DURATION
+        with order_status_hub.subscribe(order_id) as subscription:
+            status = await aget_order_status(order_id) or status
+            yield format_event(status)
+            while status['status'] not in FINAL_ORDER_STATUSES and loop.time() < deadline:
+                event = await subscription.get(ORDER_EVENTS_RECHECK_INTERVAL)
+                if event is None:
+                    event = await aget_order_status(subscription.order_id)
+                    if event is None:
+                        return
+                    if event['status'] == status['status']:
+                        yield ': keep-alive\n\n'
+                        continue
+                status = event
+                yield format_event(status)
+
+
+def format_event(status):
+    # A Server-Sent Events message carrying an order status
+    return f'event: status\ndata: {json.dumps(status)}\n\n'
@@ -1,10 +1,21 @@
 from django.contrib import admin
 
-from .models import Robot
+from R4C.admin import LargeTableAdmin
+from .models import Robot, RobotSku
 
 
-class RobotAdmin(admin.ModelAdmin):
-    list_display = ('id', 'serial', 'model', 'version', 'created', )
+class RobotAdmin(LargeTableAdmin):
+    list_display = ('id', 'sku', 'created', 'ordered', )
+    list_select_related = ('sku', )
+    # Date ranges on robot_created_idx instead of date_hierarchy, which scans the table for its years
+    list_filter = (('created', admin.DateFieldListFilter), 'sku', )
 
 
-admin.site.register(Robot, RobotAdmin)
\ No newline at end of file
+admin.site.register(Robot, RobotAdmin)
+
+
+class RobotSkuAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model', 'version', )
+
+
+admin.site.register(RobotSku, RobotSkuAdmin)
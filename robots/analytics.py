@@ -0,0 +1,283 @@
+import base64
+import json
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncHour, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from robots.catalog import catalog, get_sku_by_id
+from robots.export import parse_range_bound
+from robots.models import ArchivedRobot, DailyProduction, Robot
+
+BUCKET_KINDS = ('hour', 'day', 'week')
+ANALYTICS_PAGE_SIZE = 100
+ANALYTICS_MAX_PAGE_SIZE = 1000
+ANALYTICS_CACHE_TIMEOUT = getattr(settings, 'ROBOT_ANALYTICS_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+# Robots may be submitted after the fact, e.g. by retrying controllers, so a bucket
+# is only treated as closed once it ended this many seconds ago
+ANALYTICS_SETTLE_TIME = getattr(settings, 'ROBOT_ANALYTICS_SETTLE_TIME', 60 * 60)
+
+
+def parse_analytics_params(params):
+    """
+    Parse and validate the query parameters of the production analytics endpoint.
+
+    ``from`` is required, ``to`` defaults to now; both accept a date or a
+    ``YYYY-MM-DD HH:MM:SS`` datetime and are widened to whole buckets. ``cursor``,
+    taken from the previous page, replaces ``from``.
+
+    Args:
+        params (QueryDict): The request query parameters.
+
+    Returns:
+        tuple: A dict of the parsed parameters and a dict of error messages by parameter.
+    """
+    errors = {}
+    parsed = {
+        'bucket': params.get('bucket', 'day'),
+        'model': params.get('model') or None,
+        'version': params.get('version') or None,
+    }
+    if parsed['bucket'] not in BUCKET_KINDS:
+        errors['bucket'] = [f'Choose one of: {", ".join(BUCKET_KINDS)}.']
+
+    start = None
+    if params.get('cursor'):
+        start = decode_cursor(params['cursor'])
+        if start is None:
+            errors['cursor'] = ['Invalid cursor.']
+    elif not params.get('from'):
+        errors['from'] = ['This parameter is required.']
+    else:
+        start = parse_range_bound(params['from'])
+        if start is None:
+            errors['from'] = ['Enter a valid date or date/time.']
+
+    end = timezone.now()
+    if params.get('to'):
+        end = parse_range_bound(params['to'], end=True)
+        if end is None:
+            errors['to'] = ['Enter a valid date or date/time.']
+    if start is not None and end is not None and start >= end:
+        errors['to'] = ['The end of the range must be later than its start.']
+
+    try:
+        limit = int(params.get('limit', ANALYTICS_PAGE_SIZE))
+        if not 0 < limit <= ANALYTICS_MAX_PAGE_SIZE:
+            raise ValueError
+    except ValueError:
+        errors['limit'] = [f'Enter a number of buckets between 1 and {ANALYTICS_MAX_PAGE_SIZE}.']
+        limit = None
+
+    parsed.update(start=start, end=end, limit=limit)
+    return parsed, errors
+
+
+def get_production_series(bucket, start, end, limit=ANALYTICS_PAGE_SIZE, model=None, version=None):
+    """
+    Get one page of production counts per SKU, bucketed by hour, day or week.
+
+    A page covers up to ``limit`` consecutive buckets. Hourly counts are grouped in SQL
+    over the robots and archived robots tables; daily and weekly counts are grouped
+    over the daily production rollup. Buckets are aligned to the current time zone,
+    weeks start on Monday. Counts of closed buckets are cached for all SKUs at once,
+    and the model and version filters are applied to them afterwards. Cache keys
+    include the time the rollup of the bucket's days last changed, so robots added
+    to or deleted from a closed bucket later, in any process, are counted.
+
+    Args:
+        bucket (str): One of ``BUCKET_KINDS``.
+        start (datetime): The start of the range, moved back to the start of its bucket.
+        end (datetime): The end of the range, moved forward to the end of its bucket.
+        limit (int): The maximum number of buckets on the page.
+        model (str | None): Only count robots of this model.
+        version (str | None): Only count robots of this version.
+
+    Returns:
+        tuple: A list of series, one per model and version, each with the points of
+            its non-empty buckets, and the cursor of the next page or None.
+    """
+    buckets = []
+    bucket_start = truncate(start, bucket)
+    while bucket_start < end and len(buckets) < limit:
+        buckets.append(bucket_start)
+        bucket_start = next_bucket(bucket_start, bucket)
+    page_end = bucket_start
+
+    counts = get_bucket_counts(bucket, buckets, page_end)
+    sku_ids = None
+    if model is not None or version is not None:
+        sku_ids = {
+            sku.id for sku in catalog.all()
+            if model in (None, sku.model) and version in (None, sku.version)
+        }
+
+    series = {}
+    for bucket_start in buckets:
+        for sku_id, count in sorted(counts[bucket_start].items()):
+            if sku_ids is None or sku_id in sku_ids:
+                series.setdefault(sku_id, []).append({'start': bucket_start.isoformat(), 'count': count})
+    series = [
+        {'model': sku.model, 'version': sku.version, 'points': points}
+        for sku, points in ((get_sku_by_id(sku_id), points) for sku_id, points in series.items())
+    ]
+    series.sort(key=lambda item: (item['model'], item['version']))
+
+    next_cursor = encode_cursor(page_end) if page_end < end else None
+    return series, next_cursor
+
+
+def get_bucket_counts(bucket, buckets, page_end):
+    # Counts per SKU id of every bucket, closed ones from the cache where possible
+    settled = timezone.now() - timedelta(seconds=ANALYTICS_SETTLE_TIME)
+    closed = [
+        bucket_start for bucket_start, bucket_end in zip(buckets, [*buckets[1:], page_end])
+        if bucket_end <= settled
+    ]
+    versions = get_day_versions(buckets[0], page_end) if closed else {}
+    keys = {
+        bucket_start: _cache_key(bucket, bucket_start, _bucket_version(versions, bucket, bucket_start))
+        for bucket_start in closed
+    }
+    cached = cache.get_many(keys.values())
+
+    counts = {}
+    for bucket_start, key in keys.items():
+        if key in cached:
+            counts[bucket_start] = Counter(cached[key])
+    missing = [bucket_start for bucket_start in buckets if bucket_start not in counts]
+    if not missing:
+        return counts
+
+    # Cached buckets come first, as only the most recent ones are open, so one query
+    # from the first missing bucket on covers the rest of the page
+    computed = count_buckets(bucket, missing[0], page_end)
+    for bucket_start in missing:
+        counts[bucket_start] = computed.get(bucket_start, Counter())
+    cache.set_many(
+        {keys[bucket_start]: dict(counts[bucket_start]) for bucket_start in missing if bucket_start in keys},
+        ANALYTICS_CACHE_TIMEOUT,
+    )
+    return counts
+
+
+def get_day_versions(start, end):
+    """
+    Get the time the rollup of each day last changed.
+
+    ``record_production`` and ``discard_production`` update the rollup when robots
+    are created or deleted, including backdated ones, so a day's version changes
+    whenever its counts may have.
+
+    Args:
+        start (datetime): The start of the range.
+        end (datetime): The end of the range.
+
+    Returns:
+        dict: Versions in microseconds, keyed by day; days without rollup rows are missing.
+    """
+    rows = (
+        DailyProduction.objects.filter(day__gte=timezone.localdate(start), day__lte=timezone.localdate(end))
+        .values('day')
+        .annotate(updated=Max('updated'))
+        .order_by()
+    )
+    return {
+        row['day']: int(row['updated'].timestamp()) * 1_000_000 + row['updated'].microsecond
+        for row in rows
+    }
+
+
+def count_buckets(bucket, start, end):
+    """
+    Count robots per bucket and SKU in SQL.
+
+    Args:
+        bucket (str): One of ``BUCKET_KINDS``.
+        start (datetime): The start of the first bucket.
+        end (datetime): The end of the last bucket.
+
+    Returns:
+        dict: Counters of robots by SKU id, keyed by the bucket start.
+    """
+    tz = timezone.get_current_timezone()
+    counts = {}
+    if bucket == 'hour':
+        for model_class in (Robot, ArchivedRobot):
+            rows = (
+                model_class.objects.filter(created__gte=start, created__lt=end)
+                .annotate(bucket=TruncHour('created', tzinfo=tz))
+                .values('bucket', 'sku_id')
+                .annotate(count=Count('id'))
+                .order_by()
+            )
+            for row in rows:
+                counts.setdefault(row['bucket'], Counter())[row['sku_id']] += row['count']
+        return counts
+
+    rollup = DailyProduction.objects.filter(
+        day__gte=timezone.localdate(start), day__lt=timezone.localdate(end), count__gt=0,
+    )
+    group = 'day'
+    if bucket == 'week':
+        rollup = rollup.annotate(week=TruncWeek('day'))
+        group = 'week'
+    rows = rollup.values(group, 'sku_id').annotate(total=Sum('count')).order_by()
+    for row in rows:
+        bucket_start = _day_start(row[group])
+        counts.setdefault(bucket_start, Counter())[row['sku_id']] += row['total']
+    return counts
+
+
+def truncate(moment, bucket):
+    # The start of the bucket a moment falls into, in the current time zone
+    local = timezone.localtime(moment)
+    if bucket == 'hour':
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = local.date()
+    if bucket == 'week':
+        day -= timedelta(days=day.weekday())
+    return _day_start(day)
+
+
+def next_bucket(bucket_start, bucket):
+    # The start of the following bucket; hours are added in UTC, days as calendar days
+    if bucket == 'hour':
+        moment = bucket_start.astimezone(dt_timezone.utc) + timedelta(hours=1)
+        return timezone.localtime(moment)
+    days = 7 if bucket == 'week' else 1
+    return _day_start(timezone.localdate(bucket_start) + timedelta(days=days))
+
+
+def encode_cursor(moment):
+    return base64.urlsafe_b64encode(json.dumps({'after': moment.isoformat()}).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        moment = parse_datetime(json.loads(base64.urlsafe_b64decode(cursor.encode()))['after'])
+    except (ValueError, TypeError, KeyError):
+        return None
+    if moment is None or timezone.is_naive(moment):
+        return None
+    return moment
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _bucket_version(versions, bucket, bucket_start):
+    # The latest version of the days a bucket covers
+    first_day = timezone.localdate(bucket_start)
+    days = 7 if bucket == 'week' else 1
+    return max(versions.get(first_day + timedelta(days=offset), 0) for offset in range(days))
+
+
+def _cache_key(bucket, bucket_start, version):
+    return f'robots:analytics:{bucket}:{int(bucket_start.timestamp())}:{version}'
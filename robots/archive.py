@@ -0,0 +1,120 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, Order
+from robots.models import ArchivedRobot, Robot
+
+ARCHIVE_HORIZON_DAYS = getattr(settings, 'ARCHIVE_HORIZON_DAYS', 365)
+ARCHIVE_BATCH_SIZE = getattr(settings, 'ARCHIVE_BATCH_SIZE', 1000)
+ROBOT_FIELDS = ('id', 'sku_id', 'created', 'ordered')
+ORDER_FIELDS = ('id', 'customer_id', 'sku_id', 'robot_id', 'status')
+
+
+def archive_history(
+    horizon_days=ARCHIVE_HORIZON_DAYS, batch_size=ARCHIVE_BATCH_SIZE, pause=0, unlinked_orders=False,
+):
+    """
+    Move sold robots older than the horizon, along with their orders, into the archive tables.
+
+    Robots still in stock stay in the robots table whatever their age, so claims,
+    allocation and stock counters only ever see the hot tier. Every batch is moved in
+    its own short transaction, so writers are never blocked for long. The daily
+    production rollup is left untouched, as archived robots are still produced robots.
+
+    Orders fulfilled before orders recorded their robot are 'READY' with no robot, so
+    their age is unknown and they are only archived when ``unlinked_orders`` is set.
+
+    Args:
+        horizon_days (int): Robots created more than this many days ago are archived.
+        batch_size (int): The number of robots moved per transaction.
+        pause (float): Seconds to sleep between batches, leaving room for other writers.
+        unlinked_orders (bool): Also archive all ready orders with no robot.
+
+    Returns:
+        tuple: The number of archived robots and orders.
+    """
+    cutoff = timezone.now() - timedelta(days=horizon_days)
+    candidates = Robot.objects.filter(created__lt=cutoff, ordered=True).order_by('id')
+    robots_archived = orders_archived = 0
+
+    while True:
+        with transaction.atomic():
+            robot_ids = list(candidates.values_list('id', flat=True)[:batch_size])
+            if not robot_ids:
+                break
+            orders_archived += archive_batch(robot_ids)
+            robots_archived += len(robot_ids)
+        if pause:
+            time.sleep(pause)
+
+    if unlinked_orders:
+        orders_archived += archive_unlinked_orders(batch_size, pause)
+    return robots_archived, orders_archived
+
+
+def archive_unlinked_orders(batch_size=ARCHIVE_BATCH_SIZE, pause=0):
+    """
+    Move ready orders with no robot into the archive, in batches.
+
+    Args:
+        batch_size (int): The number of orders moved per transaction.
+        pause (float): Seconds to sleep between batches.
+
+    Returns:
+        int: The number of archived orders.
+    """
+    candidates = Order.objects.filter(status='READY', robot__isnull=True).order_by('id')
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(candidates.values(*ORDER_FIELDS)[:batch_size])
+            if not rows:
+                return archived
+            ArchivedOrder.objects.bulk_create(ArchivedOrder(**row) for row in rows)
+            _delete_rows(Order, [row['id'] for row in rows])
+            archived += len(rows)
+        if pause:
+            time.sleep(pause)
+
+
+def archive_batch(robot_ids):
+    """
+    Copy robots and the orders holding them into the archive and delete the originals.
+
+    Must run inside a transaction. The originals are deleted without sending
+    ``post_delete``: the rollup and the cached report must keep counting them.
+
+    Args:
+        robot_ids (list): The ids of the robots to archive.
+
+    Returns:
+        int: The number of archived orders.
+    """
+    robots = Robot.objects.filter(id__in=robot_ids)
+    order_rows = list(Order.objects.filter(robot_id__in=robot_ids).values(*ORDER_FIELDS))
+
+    ArchivedRobot.objects.bulk_create(
+        ArchivedRobot(**row) for row in robots.values(*ROBOT_FIELDS)
+    )
+    ArchivedOrder.objects.bulk_create(ArchivedOrder(**row) for row in order_rows)
+
+    # Orders go first, as they reference the robots
+    _delete_rows(Order, [row['id'] for row in order_rows])
+    _delete_rows(Robot, robot_ids)
+    return len(order_rows)
+
+
+def _delete_rows(model, ids):
+    # Delete rows by primary key in plain SQL, which sends no delete signals
+    if not ids:
+        return
+    connection = connections[router.db_for_write(model)]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', ids)
@@ -0,0 +1,151 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from robots.models import RobotSku
+
+UNKNOWN_SKU_MESSAGE = 'Unknown robot model and version.'
+CATALOG_TTL = getattr(settings, 'ROBOT_CATALOG_TTL', 5 * 60)
+CATALOG_MISS_RELOAD_INTERVAL = getattr(settings, 'ROBOT_CATALOG_MISS_RELOAD_INTERVAL', 5)
+
+
+class SkuCatalog:
+    """
+    An in-process copy of the robot SKU catalog.
+
+    The whole table is small, so it is loaded at once and lookups are dict reads with no
+    database hit. The copy is reloaded after ``CATALOG_TTL`` seconds, when an SKU is
+    saved or deleted in this process, and on a lookup miss, at most once per
+    ``CATALOG_MISS_RELOAD_INTERVAL`` seconds, so SKUs added by another process are
+    found without letting requests for unknown SKUs query the database every time.
+    """
+
+    def __init__(self):
+        self._by_key = None
+        self._by_id = None
+        self._loaded = 0
+        self._miss_reloaded = 0
+        self._lock = threading.Lock()
+
+    def get(self, model, version):
+        """
+        Get the SKU of a model and version.
+
+        Args:
+            model (str): The robot's model.
+            version (str): The robot's version.
+
+        Returns:
+            RobotSku | None: The SKU, or None if it is not in the catalog.
+        """
+        sku = self._get_index()[0].get((model, version))
+        if sku is None and self._reload_after_miss():
+            sku = self._by_key.get((model, version))
+        return sku
+
+    def get_by_id(self, sku_id):
+        """
+        Get an SKU by its id.
+
+        Ids come from foreign keys, so they always exist: an SKU missing from the
+        catalog was added by another process and is read from the database and added
+        to the catalog, even while reloads after misses are throttled.
+
+        Args:
+            sku_id (int): The SKU id.
+
+        Returns:
+            RobotSku: The SKU.
+
+        Raises:
+            RobotSku.DoesNotExist: If there is no SKU with the id.
+        """
+        sku = self._get_index()[1].get(sku_id)
+        if sku is None and self._reload_after_miss():
+            sku = self._by_id.get(sku_id)
+        if sku is None:
+            sku = RobotSku.objects.get(pk=sku_id)
+            self._add(sku)
+        return sku
+
+    def all(self):
+        # All SKUs of the catalog, e.g. to filter them by model or version
+        return list(self._get_index()[1].values())
+
+    def get_by_serial(self, serial):
+        # Get the SKU of a serial such as "R2-D2"
+        model, _, version = serial.partition('-')
+        return self.get(model, version)
+
+    def set_skus(self, skus):
+        # Replace the catalog contents, e.g. for benchmarks running without a database
+        with self._lock:
+            self._index(skus)
+            self._loaded = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._by_key = self._by_id = None
+
+    def _get_index(self):
+        by_key, by_id = self._by_key, self._by_id
+        if by_key is None or time.monotonic() - self._loaded > CATALOG_TTL:
+            with self._lock:
+                self._load()
+                by_key, by_id = self._by_key, self._by_id
+        return by_key, by_id
+
+    def _reload_after_miss(self):
+        now = time.monotonic()
+        if now - self._miss_reloaded < CATALOG_MISS_RELOAD_INTERVAL:
+            return False
+        with self._lock:
+            self._miss_reloaded = now
+            self._load()
+        return True
+
+    def _load(self):
+        self._index(RobotSku.objects.all())
+        self._loaded = time.monotonic()
+
+    def _add(self, sku):
+        # Add one SKU, copying the indexes so that concurrent readers never see them change
+        with self._lock:
+            if self._by_id is not None:
+                self._by_id = {**self._by_id, sku.id: sku}
+                self._by_key = {**self._by_key, (sku.model, sku.version): sku}
+
+    def _index(self, skus):
+        skus = list(skus)
+        self._by_id = {sku.id: sku for sku in skus}
+        self._by_key = {(sku.model, sku.version): sku for sku in skus}
+
+
+catalog = SkuCatalog()
+
+
+def get_sku(model, version):
+    # Get the SKU of a model and version from the in-process catalog
+    return catalog.get(model, version)
+
+
+def get_sku_by_id(sku_id):
+    # Get an SKU by id from the in-process catalog
+    return catalog.get_by_id(sku_id)
+
+
+def validate_sku(model, version):
+    """
+    Check that a model and version exist in the catalog.
+
+    Args:
+        model (str): The robot's model.
+        version (str): The robot's version.
+
+    Raises:
+        ValidationError: If the catalog has no such SKU.
+    """
+    if get_sku(model, version) is None:
+        raise ValidationError(UNKNOWN_SKU_MESSAGE, code='unknown_sku')
@@ -0,0 +1,183 @@
+import csv
+import heapq
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from robots.catalog import get_sku_by_id
+from robots.models import ArchivedRobot, Robot
+from robots.services import create_excel_workbook, iter_workbook_bytes
+
+EXPORT_HEADERS = ('serial', 'model', 'version', 'created')
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BUFFER_SIZE = 64 * 1024
+# The row limit of an Excel worksheet, headers included
+XLSX_MAX_ROWS = 1_048_576
+
+
+def parse_export_params(params):
+    """
+    Parse and validate the query parameters of a production export.
+
+    ``from`` is required, ``to`` defaults to now. Both accept a date or a
+    ``YYYY-MM-DD HH:MM:SS`` datetime; a date in ``to`` includes the whole day.
+
+    Args:
+        params (QueryDict): The request query parameters.
+
+    Returns:
+        tuple: The start and end of the range (end excluded), the export format
+            and a dict of error messages by parameter.
+    """
+    errors = {}
+    start = end = None
+
+    if not params.get('from'):
+        errors['from'] = ['This parameter is required.']
+    else:
+        start = parse_range_bound(params['from'])
+        if start is None:
+            errors['from'] = ['Enter a valid date or date/time.']
+
+    if params.get('to'):
+        end = parse_range_bound(params['to'], end=True)
+        if end is None:
+            errors['to'] = ['Enter a valid date or date/time.']
+    else:
+        end = timezone.now()
+
+    if start is not None and end is not None and start >= end:
+        errors['to'] = ['The end of the range must be later than its start.']
+
+    export_format = params.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        errors['format'] = [f'Choose one of: {", ".join(EXPORT_FORMATS)}.']
+
+    return start, end, export_format, errors
+
+
+def parse_range_bound(value, end=False):
+    # Parse a date or datetime in the current time zone; a date used as the end of the
+    # range is moved to the start of the next day, since the end is excluded
+    try:
+        day = parse_date(value)
+        if day is not None:
+            if end:
+                day += timedelta(days=1)
+            moment = datetime.combine(day, time.min)
+        else:
+            moment = parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def iter_production_rows(start, end, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate robots created in a range, ordered by creation time.
+
+    Rows are read from the robots and archived robots tables in chunks and merged,
+    so the range spans both tiers and is never loaded at once. The model, version and
+    serial come from the SKU catalog rather than a join.
+
+    Args:
+        start (datetime): The start of the range.
+        end (datetime): The end of the range, excluded.
+        chunk_size (int): The number of rows fetched at once.
+
+    Yields:
+        tuple: The serial, model, version and creation time of a robot.
+    """
+    tiers = [
+        model_class.objects.filter(created__gte=start, created__lt=end)
+        .order_by('created', 'id')
+        .values_list('id', 'sku_id', 'created')
+        .iterator(chunk_size=chunk_size)
+        for model_class in (Robot, ArchivedRobot)
+    ]
+    for _, sku_id, created in heapq.merge(*tiers, key=lambda row: (row[2], row[0])):
+        sku = get_sku_by_id(sku_id)
+        yield sku.serial, sku.model, sku.version, created
+
+
+def stream_export(rows, export_format):
+    """
+    Encode export rows in the given format, yielding the file in chunks.
+
+    Args:
+        rows: An iterable of row tuples in ``EXPORT_HEADERS`` order.
+        export_format (str): One of ``EXPORT_FORMATS``.
+
+    Returns:
+        Iterator[bytes]: The encoded file.
+    """
+    encoders = {'csv': iter_csv, 'jsonl': iter_jsonl, 'xlsx': iter_xlsx}
+    return encoders[export_format](rows)
+
+
+def iter_csv(rows):
+    # Write rows into a text buffer and hand it out whenever it fills up
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    for serial, model, version, created in rows:
+        writer.writerow((serial, model, version, format_created(created)))
+        if buffer.tell() >= EXPORT_BUFFER_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def iter_jsonl(rows):
+    # One JSON object per line, buffered like the CSV output
+    lines = []
+    size = 0
+    for serial, model, version, created in rows:
+        line = json.dumps({
+            'serial': serial, 'model': model, 'version': version, 'created': format_created(created),
+        })
+        lines.append(line)
+        size += len(line) + 1
+        if size >= EXPORT_BUFFER_SIZE:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines.clear()
+            size = 0
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+def iter_xlsx(rows):
+    # Write rows into write-only worksheets and stream the workbook while it is zipped;
+    # a full sheet continues on "Production 2" and so on, as Excel cannot open larger ones
+    workbook = create_excel_workbook(write_only=True)
+    sheets = 1
+    sheet = workbook.create_sheet('Production')
+    sheet.append(EXPORT_HEADERS)
+    sheet_rows = 1
+    for serial, model, version, created in rows:
+        if sheet_rows == XLSX_MAX_ROWS:
+            sheets += 1
+            sheet = workbook.create_sheet(f'Production {sheets}')
+            sheet.append(EXPORT_HEADERS)
+            sheet_rows = 1
+        sheet.append((serial, model, version, format_created(created)))
+        sheet_rows += 1
+    yield from iter_workbook_bytes(workbook)
+
+
+def format_created(created):
+    # Format a creation time in the current time zone, like the robot endpoints accept it
+    return timezone.localtime(created).strftime('%Y-%m-%d %H:%M:%S')
@@ -1,5 +1,6 @@
 from django import forms
 
+from robots.catalog import get_sku, validate_sku
 from robots.models import Robot
 from robots.validators import validate_model_version, validate_creation_date
 
@@ -12,30 +13,40 @@ class RobotCreateForm(forms.Form):
         validators=[validate_creation_date],
     )
 
+    def clean(self):
+        """
+        Check that the model and version exist in the SKU catalog.
+        """
+        cleaned_data = super().clean()
+        if "model" in cleaned_data and "version" in cleaned_data:
+            validate_sku(cleaned_data["model"], cleaned_data["version"])
+        return cleaned_data
+
     def save_robot(self):
         """
         Create and save a new robot based on the form data.
 
-        This method retrieves cleaned data from the form, generates the robot serial,
+        This method retrieves cleaned data from the form, looks up the robot's SKU,
         and saves the robot to the database.
         """
-        model = self.cleaned_data["model"]
-        version = self.cleaned_data["version"]
-        created = self.cleaned_data["created"]
-        serial = self.generate_serial(model, version)
-        robot = Robot(serial=serial, model=model, version=version, created=created)
+        robot = self.build_robot()
         robot.save()
 
-    @classmethod
-    def generate_serial(cls, model, version):
+    def build_robot(self):
         """
-        Generate a robot serial based on model and version.
+        Build an unsaved robot instance from the form data.
 
-        Args:
-            model (str): The robot's model.
-            version (str): The robot's version.
+        Returns:
+            Robot: The robot instance, ready to be saved or bulk created.
+        """
+        return Robot(**self.get_robot_fields())
+
+    def get_robot_fields(self):
+        """
+        Get the robot field values from the form data, with the SKU taken from the catalog.
 
         Returns:
-            str: The generated robot serial.
+            dict: The robot field values.
         """
-        return f"{model}-{version}"
+        sku = get_sku(self.cleaned_data["model"], self.cleaned_data["version"])
+        return {"sku": sku, "created": self.cleaned_data["created"]}
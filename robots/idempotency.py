@@ -0,0 +1,187 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from robots.ingestion import create_robot
+from robots.models import IngestionKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 200
+IDEMPOTENCY_CACHE_TTL = getattr(settings, 'IDEMPOTENCY_CACHE_TTL', 5 * 60)
+IDEMPOTENCY_CACHE_SIZE = getattr(settings, 'IDEMPOTENCY_CACHE_SIZE', 10_000)
+IDEMPOTENCY_KEY_RETENTION_DAYS = getattr(settings, 'IDEMPOTENCY_KEY_RETENTION_DAYS', 7)
+
+
+class IdempotencyError(Exception):
+    """Raised when an idempotency key is malformed."""
+
+
+class IdempotencyConflict(IdempotencyError):
+    """Raised when an idempotency key is reused for a different robot."""
+
+
+class RecentKeys:
+    """
+    A bounded map of recently used idempotency keys to their result, each kept for ``ttl`` seconds.
+
+    Controllers retry within seconds, so most retries are answered from here without
+    a query; older ones fall back to the ``IngestionKey`` table.
+
+    Attributes:
+        ttl (float): Seconds an entry stays valid.
+        maxsize (int): The maximum number of entries; the oldest one is dropped first.
+    """
+
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+recent_keys = RecentKeys(IDEMPOTENCY_CACHE_TTL, IDEMPOTENCY_CACHE_SIZE)
+
+
+def get_idempotency_key(request, data):
+    """
+    Get the deduplication key of a robot creation request.
+
+    The ``Idempotency-Key`` header wins; otherwise a controller sending ``controller_id``
+    and ``sequence`` in the payload is deduplicated by that natural key.
+
+    Args:
+        request (HttpRequest): The request.
+        data (dict): The decoded payload.
+
+    Returns:
+        str | None: The namespaced key, or None if the request carries none.
+
+    Raises:
+        IdempotencyError: If the key is malformed.
+    """
+    header = request.headers.get(IDEMPOTENCY_HEADER)
+    if header is not None:
+        header = header.strip()
+        if not header or len(header) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise IdempotencyError(
+                f'{IDEMPOTENCY_HEADER} must be between 1 and {IDEMPOTENCY_KEY_MAX_LENGTH} characters.'
+            )
+        return f'key:{header}'
+
+    if 'controller_id' not in data and 'sequence' not in data:
+        return None
+    controller_id, sequence = data.get('controller_id'), data.get('sequence')
+    if not isinstance(controller_id, str) or not 0 < len(controller_id) <= 64:
+        raise IdempotencyError('controller_id must be a string of 1 to 64 characters.')
+    if not isinstance(sequence, int) or isinstance(sequence, bool) or sequence < 0:
+        raise IdempotencyError('sequence must be a non-negative integer.')
+    return f'seq:{controller_id}:{sequence}'
+
+
+def fingerprint(cleaned_data):
+    # Hash of the validated values, telling a retry from a different robot sent with the same key
+    payload = json.dumps(cleaned_data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def create_robot_once(key, model, version, created):
+    """
+    Create a robot unless a request with the same idempotency key already did.
+
+    The key is inserted before the robot, in the same transaction, so of two concurrent
+    submissions only one gets past the unique index; the other finds the committed key
+    and returns its robot. Replays never touch the robots table or run the receivers.
+
+    Args:
+        key (str): The idempotency key, see ``get_idempotency_key``.
+        model (str): The robot's model.
+        version (str): The robot's version.
+        created (datetime): The robot's creation time.
+
+    Returns:
+        tuple: The robot id and True if it was created by this call, False for a replay.
+
+    Raises:
+        IdempotencyConflict: If the key was used for a different robot.
+    """
+    digest = fingerprint({'model': model, 'version': version, 'created': created})
+    cached = recent_keys.get(key)
+    if cached is not None:
+        return _replay(key, digest, *cached)
+
+    try:
+        with transaction.atomic():
+            entry = IngestionKey.objects.create(key=key, fingerprint=digest)
+            robot = create_robot(model, version, created)
+            entry.robot_id = robot.id
+            entry.save(update_fields=['robot_id'])
+    except IntegrityError:
+        entry = IngestionKey.objects.filter(key=key).only('robot_id', 'fingerprint').first()
+        if entry is None:
+            raise
+        recent_keys.put(key, (entry.robot_id, entry.fingerprint))
+        return _replay(key, digest, entry.robot_id, entry.fingerprint)
+
+    transaction.on_commit(lambda: recent_keys.put(key, (robot.id, digest)))
+    return robot.id, True
+
+
+async def acreate_robot_once(key, model, version, created):
+    """
+    Asynchronous version of ``create_robot_once`` for async views.
+
+    Cached replays are answered on the event loop; everything else runs in the thread
+    used for the async ORM.
+    """
+    cached = recent_keys.get(key)
+    if cached is not None:
+        return _replay(key, fingerprint({'model': model, 'version': version, 'created': created}), *cached)
+    return await sync_to_async(create_robot_once)(key, model, version, created)
+
+
+def prune_ingestion_keys(retention_days=IDEMPOTENCY_KEY_RETENTION_DAYS):
+    """
+    Delete idempotency keys older than the retention period.
+
+    Returns:
+        int: The number of deleted keys.
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = IngestionKey.objects.filter(created__lt=cutoff).delete()
+    return deleted
+
+
+def _replay(key, digest, robot_id, original_digest):
+    if digest != original_digest:
+        raise IdempotencyConflict('The idempotency key was already used for a different robot.')
+    return robot_id, False
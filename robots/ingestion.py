@@ -0,0 +1,210 @@
+import codecs
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from robots.catalog import get_sku
+from robots.models import Robot
+from robots.schema import ROBOT_SCHEMA
+from robots.signals import robots_created
+
+BULK_CHUNK_SIZE = 500
+READ_SIZE = 64 * 1024
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def build_robot(model, version, created):
+    """
+    Build an unsaved robot from validated data, looking up its SKU in the catalog.
+
+    Args:
+        model (str): The robot's model.
+        version (str): The robot's version.
+        created (datetime): The robot's creation time.
+
+    Returns:
+        Robot: The robot instance, ready to be saved or bulk created.
+    """
+    return Robot(sku=get_sku(model, version), created=created)
+
+
+def create_robot(model, version, created):
+    """
+    Create and save a robot from validated data.
+
+    The robot is saved in a transaction, so the rollup, stock counters and order
+    allocation updated by its ``post_save`` receivers are committed together with it.
+
+    Returns:
+        Robot: The saved robot.
+    """
+    robot = build_robot(model, version, created)
+    with transaction.atomic():
+        robot.save()
+    return robot
+
+
+async def acreate_robot(model, version, created):
+    """
+    Asynchronous version of ``create_robot`` for async views.
+
+    The save runs in the thread used for the async ORM, as the async ORM
+    cannot wrap the save and its receivers in one transaction.
+    """
+    return await sync_to_async(create_robot)(model, version, created)
+
+
+def iter_ndjson_rows(stream):
+    """
+    Read newline-delimited JSON rows from a file-like stream.
+
+    Args:
+        stream: An iterable yielding lines as bytes (e.g. the request itself).
+
+    Yields:
+        tuple: The 1-based row number and the decoded row, or None if the line is not valid JSON.
+    """
+    row = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError:
+            yield row, None
+
+
+def iter_json_array_rows(stream, read_size=READ_SIZE):
+    """
+    Read the elements of a top-level JSON array without loading the whole body.
+
+    Args:
+        stream: A file-like object with a ``read(size)`` method returning bytes.
+        read_size (int): The number of bytes read from the stream at once.
+
+    Yields:
+        tuple: The 1-based row number and the decoded element.
+
+    Raises:
+        ValueError: If the body is not a well-formed JSON array.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = 0
+    eof = False
+    expect_array_start = True
+    expect_value = True
+    row = 0
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+
+        if position >= len(buffer):
+            if eof:
+                raise ValueError('Unexpected end of JSON array')
+            chunk = stream.read(read_size)
+            eof = not chunk
+            buffer = buffer[position:] + decoder.decode(chunk, final=eof)
+            position = 0
+            continue
+
+        char = buffer[position]
+        if expect_array_start:
+            if char != '[':
+                raise ValueError('Expected a JSON array')
+            expect_array_start = False
+            position += 1
+            continue
+
+        if expect_value:
+            if char == ']' and row == 0:
+                return
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+            except ValueError:
+                value, end = None, None
+            # An element may end right at the buffer boundary (e.g. a number cut in
+            # half), so it is only accepted once more input follows or the stream ends.
+            if end is None or (end >= len(buffer) and not eof):
+                if eof:
+                    raise ValueError(f'Invalid JSON in row {row + 1}')
+                chunk = stream.read(read_size)
+                eof = not chunk
+                buffer = buffer[position:] + decoder.decode(chunk, final=eof)
+                position = 0
+                continue
+            row += 1
+            yield row, value
+            position = end
+            expect_value = False
+            continue
+
+        if char == ',':
+            expect_value = True
+            position += 1
+        elif char == ']':
+            return
+        else:
+            raise ValueError(f'Expected "," or "]" after row {row}')
+
+
+def iter_request_rows(request):
+    """
+    Pick the row reader matching the request content type.
+
+    NDJSON bodies are read line by line, anything else is treated as a JSON array.
+    """
+    if request.content_type in NDJSON_CONTENT_TYPES:
+        return iter_ndjson_rows(request)
+    return iter_json_array_rows(request)
+
+
+def bulk_create_robots(rows, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Validate and insert robots in chunks inside a single transaction.
+
+    Every chunk is validated with ``ROBOT_SCHEMA`` and written with one ``bulk_create``.
+    Since ``bulk_create`` does not send ``post_save``, the ``robots_created`` signal is sent
+    for each written chunk instead.
+
+    Args:
+        rows: An iterable of ``(row_number, data)`` tuples.
+        chunk_size (int): The number of rows validated and inserted at once.
+
+    Returns:
+        tuple: The number of created robots and a list of per-row errors.
+    """
+    created = 0
+    errors = []
+    rows = iter(rows)
+
+    with transaction.atomic():
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            robots = []
+            for row, data in chunk:
+                if not isinstance(data, dict):
+                    errors.append({'row': row, 'error': 'Invalid JSON data'})
+                    continue
+                cleaned_data, row_errors = ROBOT_SCHEMA.validate(data)
+                if row_errors:
+                    errors.append({'row': row, 'errors': row_errors})
+                else:
+                    robots.append(build_robot(**cleaned_data))
+
+            if robots:
+                robots = Robot.objects.bulk_create(robots, batch_size=chunk_size)
+                robots_created.send(sender=Robot, robots=robots)
+                created += len(robots)
+
+    return created, errors
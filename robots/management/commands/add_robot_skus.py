@@ -0,0 +1,31 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from robots.models import RobotSku
+from robots.validators import validate_model_version
+
+
+class Command(BaseCommand):
+    help = 'Add robot models and versions to the SKU catalog, e.g. "add_robot_skus R2-D2 13-XS".'
+
+    def add_arguments(self, parser):
+        parser.add_argument('serials', nargs='+', help='Serials in the MODEL-VERSION form.')
+
+    def handle(self, *args, **options):
+        keys = []
+        for serial in options['serials']:
+            model, separator, version = serial.partition('-')
+            try:
+                if not separator or not 0 < len(model) <= 2 or not 0 < len(version) <= 2:
+                    raise ValidationError('Expected a serial such as "R2-D2".')
+                validate_model_version(model)
+                validate_model_version(version)
+            except ValidationError as e:
+                raise CommandError(f'{serial}: {" ".join(e.messages)}')
+            keys.append((model, version))
+
+        added = 0
+        for model, version in keys:
+            sku, created = RobotSku.objects.get_or_create(model=model, version=version)
+            added += created
+        self.stdout.write(self.style.SUCCESS(f'Added {added} SKUs, {len(keys) - added} already existed.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from robots.archive import ARCHIVE_BATCH_SIZE, ARCHIVE_HORIZON_DAYS, archive_history
+
+
+class Command(BaseCommand):
+    help = 'Move sold robots older than the horizon, along with their orders, into the archive tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days', type=int, default=ARCHIVE_HORIZON_DAYS,
+            help='Archive robots created more than this many days ago.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+            help='Number of robots moved per transaction.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to wait between batches.',
+        )
+        parser.add_argument(
+            '--unlinked-orders', action='store_true',
+            help='Also archive ready orders with no robot, fulfilled before orders recorded their robot.',
+        )
+
+    def handle(self, *args, **options):
+        robots, orders = archive_history(
+            options['horizon_days'], options['batch_size'], options['pause'], options['unlinked_orders'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {robots} robots and {orders} orders.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from robots.idempotency import IDEMPOTENCY_KEY_RETENTION_DAYS, prune_ingestion_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete robot ingestion idempotency keys older than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=IDEMPOTENCY_KEY_RETENTION_DAYS,
+            help='Delete keys created more than this many days ago.',
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_ingestion_keys(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} idempotency keys.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from robots.rollup import rebuild_production_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily production rollup used by the weekly report from the robots table.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_production_rollup()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily production rows.'))
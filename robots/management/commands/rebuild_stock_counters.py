@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from robots.stock import rebuild_stock_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-serial stock and waiting order counters from the robots and orders tables.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_stock_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} stock counter rows.'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from robots.report_files import get_closed_week, render_rolling_report, render_weekly_report
+from robots.services import REPORT_PERIOD
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the production report of the last closed week, and optionally of the past seven days, '
+        'to ROBOT_REPORT_DIR. Meant to be run from cron, e.g. early on Mondays.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--weeks', type=int, default=1,
+            help='Number of closed weeks to render, counting back from the last one.',
+        )
+        parser.add_argument(
+            '--rolling', action='store_true',
+            help='Also render the report of the past seven days up to now.',
+        )
+
+    def handle(self, *args, **options):
+        week_start, week_end = get_closed_week()
+        for _ in range(options['weeks']):
+            report = render_weekly_report(week_start, week_end)
+            if report is None:
+                self.stdout.write(f'No robots were produced in the week of {week_start.date()}.')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Rendered {report.path}.'))
+            week_start, week_end = week_start - REPORT_PERIOD, week_start
+
+        if options['rolling']:
+            report = render_rolling_report()
+            if report is None:
+                self.stdout.write('No robots were produced in the past seven days.')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Rendered {report.path}.'))
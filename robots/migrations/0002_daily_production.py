@@ -0,0 +1,45 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:08
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_daily_production(apps, schema_editor):
+    Robot = apps.get_model('robots', 'Robot')
+    DailyProduction = apps.get_model('robots', 'DailyProduction')
+    rows = (
+        Robot.objects.annotate(day=TruncDate('created', tzinfo=timezone.get_current_timezone()))
+        .values('model', 'version', 'day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    DailyProduction.objects.bulk_create(
+        (DailyProduction(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProduction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=2)),
+                ('version', models.CharField(max_length=2)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproduction',
+            constraint=models.UniqueConstraint(fields=('model', 'version', 'day'), name='unique_daily_production'),
+        ),
+        migrations.RunPython(backfill_daily_production, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0002_daily_production'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyproduction',
+            index=models.Index(fields=['day'], name='daily_production_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='robot',
+            index=models.Index(condition=models.Q(('ordered', False)), fields=['serial'], name='robot_available_serial_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='robot',
+            index=models.Index(fields=['created'], name='robot_created_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stock_counters(apps, schema_editor):
+    Robot = apps.get_model('robots', 'Robot')
+    Order = apps.get_model('orders', 'Order')
+    StockCounter = apps.get_model('robots', 'StockCounter')
+    counters = {}
+    available = Robot.objects.filter(ordered=False).values('serial').annotate(count=Count('id')).order_by()
+    for row in available:
+        counters.setdefault(row['serial'], StockCounter(serial=row['serial'])).available = row['count']
+    waiting = (
+        Order.objects.filter(status='ROBOT_IS_OUT_OF_STOCK')
+        .values('robot_serial').annotate(count=Count('id')).order_by()
+    )
+    for row in waiting:
+        counters.setdefault(row['robot_serial'], StockCounter(serial=row['robot_serial'])).waiting = row['count']
+    StockCounter.objects.bulk_create(counters.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0003_hot_query_indexes'),
+        ('orders', '0004_order_robot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('serial', models.CharField(max_length=5, unique=True)),
+                ('available', models.IntegerField(default=0)),
+                ('waiting', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stock_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0004_stock_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRobot',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('serial', models.CharField(max_length=5)),
+                ('model', models.CharField(max_length=2)),
+                ('version', models.CharField(max_length=2)),
+                ('created', models.DateTimeField()),
+                ('ordered', models.BooleanField(default=True)),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created'], name='archived_robot_created_idx')],
+            },
+        ),
+    ]
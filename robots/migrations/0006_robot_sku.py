@@ -0,0 +1,210 @@
+# Generated by Django 4.2.5 on 2026-10-18 20:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_skus(apps, schema_editor):
+    # Create one SKU per model and version found in any table, then point the rows at it
+    RobotSku = apps.get_model('robots', 'RobotSku')
+    Robot = apps.get_model('robots', 'Robot')
+    ArchivedRobot = apps.get_model('robots', 'ArchivedRobot')
+    DailyProduction = apps.get_model('robots', 'DailyProduction')
+    StockCounter = apps.get_model('robots', 'StockCounter')
+    Order = apps.get_model('orders', 'Order')
+    ArchivedOrder = apps.get_model('orders', 'ArchivedOrder')
+
+    keys = set()
+    for model_class in (Robot, ArchivedRobot, DailyProduction):
+        keys.update(model_class.objects.values_list('model', 'version').distinct())
+    serials = set(StockCounter.objects.values_list('serial', flat=True))
+    for model_class in (Order, ArchivedOrder):
+        serials.update(model_class.objects.values_list('robot_serial', flat=True).distinct())
+    for serial in serials:
+        model, _, version = serial.partition('-')
+        keys.add((model, version))
+
+    RobotSku.objects.bulk_create(
+        [RobotSku(model=model, version=version) for model, version in sorted(keys)], batch_size=1000
+    )
+    for sku in RobotSku.objects.all():
+        for model_class in (Robot, ArchivedRobot, DailyProduction):
+            model_class.objects.filter(model=sku.model, version=sku.version).update(sku=sku)
+        StockCounter.objects.filter(serial=f'{sku.model}-{sku.version}').update(sku=sku)
+
+
+def restore_model_version(apps, schema_editor):
+    # Fill the model, version and serial columns back in from the SKUs
+    RobotSku = apps.get_model('robots', 'RobotSku')
+    Robot = apps.get_model('robots', 'Robot')
+    ArchivedRobot = apps.get_model('robots', 'ArchivedRobot')
+    DailyProduction = apps.get_model('robots', 'DailyProduction')
+    StockCounter = apps.get_model('robots', 'StockCounter')
+
+    for sku in RobotSku.objects.all():
+        serial = f'{sku.model}-{sku.version}'
+        for model_class in (Robot, ArchivedRobot):
+            model_class.objects.filter(sku=sku).update(serial=serial, model=sku.model, version=sku.version)
+        DailyProduction.objects.filter(sku=sku).update(model=sku.model, version=sku.version)
+        StockCounter.objects.filter(sku=sku).update(serial=serial)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0005_archived_robot'),
+        ('orders', '0005_archived_order'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RobotSku',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=2)),
+                ('version', models.CharField(max_length=2)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model', 'version'), name='unique_robot_sku')],
+            },
+        ),
+        migrations.AddField(
+            model_name='robot',
+            name='sku',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='robots', to='robots.robotsku'),
+        ),
+        migrations.AddField(
+            model_name='archivedrobot',
+            name='sku',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_robots', to='robots.robotsku'),
+        ),
+        migrations.AddField(
+            model_name='dailyproduction',
+            name='sku',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='robots.robotsku'),
+        ),
+        migrations.AddField(
+            model_name='stockcounter',
+            name='sku',
+            field=models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, to='robots.robotsku'),
+        ),
+        # The old columns become nullable first, so the migration can be reversed
+        migrations.AlterField(
+            model_name='robot',
+            name='serial',
+            field=models.CharField(max_length=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name='robot',
+            name='model',
+            field=models.CharField(max_length=2, null=True),
+        ),
+        migrations.AlterField(
+            model_name='robot',
+            name='version',
+            field=models.CharField(max_length=2, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedrobot',
+            name='serial',
+            field=models.CharField(max_length=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedrobot',
+            name='model',
+            field=models.CharField(max_length=2, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedrobot',
+            name='version',
+            field=models.CharField(max_length=2, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailyproduction',
+            name='model',
+            field=models.CharField(max_length=2, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dailyproduction',
+            name='version',
+            field=models.CharField(max_length=2, null=True),
+        ),
+        migrations.AlterField(
+            model_name='stockcounter',
+            name='serial',
+            field=models.CharField(max_length=5, null=True, unique=True),
+        ),
+        migrations.RunPython(create_skus, restore_model_version),
+        migrations.RemoveIndex(
+            model_name='robot',
+            name='robot_available_serial_idx',
+        ),
+        migrations.RemoveConstraint(
+            model_name='dailyproduction',
+            name='unique_daily_production',
+        ),
+        migrations.RemoveField(
+            model_name='robot',
+            name='serial',
+        ),
+        migrations.RemoveField(
+            model_name='robot',
+            name='model',
+        ),
+        migrations.RemoveField(
+            model_name='robot',
+            name='version',
+        ),
+        migrations.RemoveField(
+            model_name='archivedrobot',
+            name='serial',
+        ),
+        migrations.RemoveField(
+            model_name='archivedrobot',
+            name='model',
+        ),
+        migrations.RemoveField(
+            model_name='archivedrobot',
+            name='version',
+        ),
+        migrations.RemoveField(
+            model_name='dailyproduction',
+            name='model',
+        ),
+        migrations.RemoveField(
+            model_name='dailyproduction',
+            name='version',
+        ),
+        migrations.RemoveField(
+            model_name='stockcounter',
+            name='serial',
+        ),
+        migrations.AlterField(
+            model_name='robot',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='robots', to='robots.robotsku'),
+        ),
+        migrations.AlterField(
+            model_name='archivedrobot',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_robots', to='robots.robotsku'),
+        ),
+        migrations.AlterField(
+            model_name='dailyproduction',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='robots.robotsku'),
+        ),
+        migrations.AlterField(
+            model_name='stockcounter',
+            name='sku',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='robots.robotsku'),
+        ),
+        migrations.AddIndex(
+            model_name='robot',
+            index=models.Index(condition=models.Q(('ordered', False)), fields=['sku'], name='robot_available_sku_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproduction',
+            constraint=models.UniqueConstraint(fields=('sku', 'day'), name='unique_daily_production'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0006_robot_sku'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('robot_id', models.BigIntegerField(null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created'], name='ingestion_key_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.5 on 2026-10-18 20:17
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0007_ingestion_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyproduction',
+            name='updated',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
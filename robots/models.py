@@ -1,9 +1,89 @@
 from django.db import models
+from django.utils import timezone
 
 
-class Robot(models.Model):
-    serial = models.CharField(max_length=5, blank=False, null=False)
+class RobotSku(models.Model):
+    """A robot model and version known to the system. Robots and orders reference it by id."""
     model = models.CharField(max_length=2, blank=False, null=False)
     version = models.CharField(max_length=2, blank=False, null=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'version'], name='unique_robot_sku'),
+        ]
+
+    @property
+    def serial(self):
+        return f'{self.model}-{self.version}'
+
+    def __str__(self):
+        return self.serial
+
+
+class Robot(models.Model):
+    sku = models.ForeignKey(RobotSku, on_delete=models.PROTECT, related_name='robots')
     created = models.DateTimeField(blank=False, null=False)
     ordered = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Only robots still in stock, matching the ``ordered=False`` lookups of order placement
+            models.Index(fields=['sku'], condition=models.Q(ordered=False), name='robot_available_sku_idx'),
+            models.Index(fields=['created'], name='robot_created_idx'),
+        ]
+
+
+class DailyProduction(models.Model):
+    """Number of robots of one SKU produced on one day, kept up to date on creation."""
+    sku = models.ForeignKey(RobotSku, on_delete=models.CASCADE)
+    day = models.DateField(blank=False, null=False)
+    count = models.PositiveIntegerField(default=0)
+    # When the count last changed, shared by all processes to version cached reports
+    updated = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sku', 'day'], name='unique_daily_production'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='daily_production_day_idx'),
+        ]
+
+
+class StockCounter(models.Model):
+    """Robots in stock and orders waiting for one SKU, kept up to date on creation, ordering and fulfillment."""
+    sku = models.OneToOneField(RobotSku, on_delete=models.CASCADE)
+    available = models.IntegerField(default=0)
+    waiting = models.IntegerField(default=0)
+
+
+class ArchivedRobot(models.Model):
+    """A sold robot moved out of the robots table by ``archive_history``, keeping its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    sku = models.ForeignKey(RobotSku, on_delete=models.PROTECT, related_name='archived_robots')
+    created = models.DateTimeField(blank=False, null=False)
+    ordered = models.BooleanField(default=True)
+    archived = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created'], name='archived_robot_created_idx'),
+        ]
+
+
+class IngestionKey(models.Model):
+    """
+    Idempotency key of a robot creation request, so a retried request creates no second robot.
+
+    ``robot_id`` is a plain column rather than a foreign key, as archiving moves robots
+    without cascading to other tables.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    robot_id = models.BigIntegerField(null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created'], name='ingestion_key_created_idx'),
+        ]
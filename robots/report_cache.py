@@ -0,0 +1,133 @@
+import io
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+from robots.models import DailyProduction
+from robots.rollup import production_day
+from robots.services import REPORT_PERIOD, generate_report
+
+REPORT_CACHE_TIMEOUT = getattr(settings, 'ROBOT_REPORT_CACHE_TIMEOUT', 60 * 60 * 24)
+REPORT_WINDOW_STEP = getattr(settings, 'ROBOT_REPORT_WINDOW_STEP', 60 * 60)
+
+_generation_locks = {}
+_generation_locks_guard = threading.Lock()
+
+
+class CachedReport:
+    """
+    A rendered weekly report identified by its window and production stamp.
+
+    Attributes:
+        window_start (datetime): The start of the reporting window.
+        stamp (int): The production stamp of the window the report was requested for.
+    """
+
+    def __init__(self, window_start, stamp):
+        self.window_start = window_start
+        self.stamp = stamp
+
+    @property
+    def cache_key(self):
+        return f'robots:report:{int(self.window_start.timestamp())}:{self.stamp}'
+
+    @property
+    def etag(self):
+        return f'"{int(self.window_start.timestamp())}-{self.stamp}"'
+
+    @property
+    def last_modified(self):
+        # The content changes when a robot in the window is created or when the
+        # window moves on, whichever happened last
+        stamp_time = self.stamp // 1_000_000_000
+        window_time = int((self.window_start + REPORT_PERIOD).timestamp())
+        return max(stamp_time, window_time)
+
+    def get_content(self):
+        """
+        Get the rendered xlsx bytes, generating them once for concurrent requests.
+
+        Returns:
+            bytes: The report file, or empty bytes if no robots were produced in the window.
+        """
+        content = cache.get(self.cache_key)
+        if content is not None:
+            return content
+
+        with _generation_lock(self.cache_key):
+            content = cache.get(self.cache_key)
+            if content is None:
+                content = render_report(self.window_start)
+                cache.set(self.cache_key, content, REPORT_CACHE_TIMEOUT)
+        return content
+
+
+def get_cached_report():
+    # Get the report for the current window and production stamp
+    window_start = get_report_window_start()
+    return CachedReport(window_start, get_production_stamp(window_start))
+
+
+def get_report_window_start(now=None):
+    # Align the start of the reporting window to REPORT_WINDOW_STEP, so that
+    # requests within one step share a cache entry
+    now = now or timezone.now()
+    start = int((now - REPORT_PERIOD).timestamp())
+    return datetime.fromtimestamp(start - start % REPORT_WINDOW_STEP, tz=dt_timezone.utc)
+
+
+def get_production_stamp(window_start):
+    """
+    Get the time the production of a reporting window last changed, in nanoseconds.
+
+    The stamp is read from the rollup rows of the window, which every process updates
+    when robots are created or deleted, so all workers see the same stamp without
+    sharing a cache. Robots created or deleted outside the window leave it unchanged.
+
+    Args:
+        window_start (datetime): The start of the reporting window.
+
+    Returns:
+        int: The stamp, or 0 if no robots were produced in the window.
+    """
+    updated = (
+        DailyProduction.objects.filter(day__gte=production_day(window_start))
+        .aggregate(updated=Max('updated'))['updated']
+    )
+    if updated is None:
+        return 0
+    return int(updated.timestamp()) * 1_000_000_000 + updated.microsecond * 1000
+
+
+def render_report(window_start):
+    # Render the report for the window into xlsx bytes
+    workbook, report_data = generate_report(window_start)
+    if not report_data:
+        return b''
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@contextmanager
+def _generation_lock(key):
+    # Serialize generation per cache key, so a cold window is rendered only once
+    with _generation_locks_guard:
+        lock, users = _generation_locks.get(key, (None, 0))
+        lock = lock or threading.Lock()
+        _generation_locks[key] = (lock, users + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _generation_locks_guard:
+            lock, users = _generation_locks[key]
+            if users == 1:
+                del _generation_locks[key]
+            else:
+                _generation_locks[key] = (lock, users - 1)
@@ -0,0 +1,189 @@
+import os
+import re
+import tempfile
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from robots.services import REPORT_PERIOD, generate_report
+
+REPORT_DIR = getattr(settings, 'ROBOT_REPORT_DIR', os.path.join(settings.BASE_DIR, 'reports'))
+# None to stream files from Django, 'x-sendfile' (Apache, lighttpd) or 'x-accel-redirect' (nginx)
+REPORT_SENDFILE = getattr(settings, 'ROBOT_REPORT_SENDFILE', None)
+REPORT_ACCEL_PREFIX = getattr(settings, 'ROBOT_REPORT_ACCEL_PREFIX', '/protected/reports/')
+# The rolling report is served from disk for this many seconds after it was rendered
+REPORT_MAX_AGE = getattr(settings, 'ROBOT_REPORT_MAX_AGE', 2 * 60 * 60)
+ROLLING_REPORT_NAME = 'robot_report_rolling.xlsx'
+WEEKLY_REPORT_NAME = re.compile(r'^robot_report_(?P<week>\d{4}-W\d{2})\.xlsx$')
+WEEK_FORMAT = '%G-W%V'
+
+
+class ReportFile:
+    """
+    A report rendered to the report directory.
+
+    Attributes:
+        path (str): The path of the file.
+        week (str | None): The ISO week of a weekly report, such as "2023-W40",
+            or None for the rolling report.
+    """
+
+    def __init__(self, path, week=None):
+        self.path = path
+        self.week = week
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+    @property
+    def week_start(self):
+        # The Monday the week of a weekly report starts on
+        return datetime.strptime(f'{self.week}-1', '%G-W%V-%u').date()
+
+    def stat(self):
+        return os.stat(self.path)
+
+
+def get_closed_week(now=None):
+    """
+    Get the last full Monday to Sunday week before the current one, in the current time zone.
+
+    Args:
+        now (datetime | None): The current time, defaults to now.
+
+    Returns:
+        tuple: The start and the end (excluded) of the week.
+    """
+    today = timezone.localdate(now or timezone.now())
+    monday = today - timedelta(days=today.weekday())
+    start = timezone.make_aware(datetime.combine(monday - REPORT_PERIOD, time.min))
+    return start, start + REPORT_PERIOD
+
+
+def weekly_report_path(week):
+    return os.path.join(REPORT_DIR, f'robot_report_{week}.xlsx')
+
+
+def render_weekly_report(week_start, week_end):
+    """
+    Render the report of a closed week to the report directory.
+
+    Args:
+        week_start (datetime): The start of the week.
+        week_end (datetime): The end of the week, excluded.
+
+    Returns:
+        ReportFile | None: The written report, or None if no robots were produced that week.
+    """
+    week = timezone.localtime(week_start).strftime(WEEK_FORMAT)
+    path = weekly_report_path(week)
+    if not write_report(path, week_start, week_end):
+        return None
+    return ReportFile(path, week)
+
+
+def render_rolling_report(now=None):
+    """
+    Render the report of the past week up to now, served by the report endpoint while it is fresh.
+
+    An empty window removes the previous rolling report, so its old counts are not served.
+
+    Returns:
+        ReportFile | None: The written report, or None if no robots were produced.
+    """
+    path = os.path.join(REPORT_DIR, ROLLING_REPORT_NAME)
+    now = now or timezone.now()
+    if not write_report(path, now - REPORT_PERIOD, now):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        return None
+    return ReportFile(path)
+
+
+def write_report(path, start, end):
+    """
+    Render a report and move it into place atomically.
+
+    The workbook is written to a temporary file in the same directory and renamed over
+    the previous version, so a download in progress keeps reading the old file and
+    a new one never sees a partly written workbook. An empty window leaves the
+    previous file in place.
+
+    Args:
+        path (str): The destination path.
+        start (datetime): The start of the window.
+        end (datetime): The end of the window, excluded.
+
+    Returns:
+        bool: True if the report was written.
+    """
+    workbook, report_data = generate_report(start, end)
+    if not report_data:
+        return False
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(prefix='.robot_report_', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            workbook.save(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return True
+
+
+def list_weekly_reports():
+    """
+    List the weekly reports in the report directory, newest week first.
+
+    Returns:
+        list: ReportFile instances.
+    """
+    try:
+        names = os.listdir(REPORT_DIR)
+    except FileNotFoundError:
+        return []
+    reports = []
+    for name in names:
+        match = WEEKLY_REPORT_NAME.match(name)
+        if match:
+            reports.append(ReportFile(os.path.join(REPORT_DIR, name), match['week']))
+    return sorted(reports, key=lambda report: report.week, reverse=True)
+
+
+def get_weekly_report(week):
+    # Get the weekly report of an ISO week such as "2023-W40", or None if it was not rendered
+    path = weekly_report_path(week)
+    return ReportFile(path, week) if os.path.isfile(path) else None
+
+
+def get_rolling_report(now=None):
+    """
+    Get the rolling report if it was rendered less than ``REPORT_MAX_AGE`` seconds ago.
+
+    Older files no longer cover the past week, e.g. when cron stopped, and weekly
+    reports only cover closed weeks, so neither stands in for the report of the past week.
+
+    Args:
+        now (datetime | None): The current time, defaults to now.
+
+    Returns:
+        ReportFile | None: The report, or None if there is no fresh rolling report.
+    """
+    report = ReportFile(os.path.join(REPORT_DIR, ROLLING_REPORT_NAME))
+    try:
+        rendered = report.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if (now or timezone.now()).timestamp() - rendered > REPORT_MAX_AGE:
+        return None
+    return report
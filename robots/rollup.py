@@ -0,0 +1,160 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from robots.catalog import get_sku_by_id
+from robots.models import ArchivedRobot, DailyProduction, Robot
+
+ROLLUP_BATCH_SIZE = 1000
+
+
+def production_day(created):
+    """
+    Get the day a robot is counted under in the rollup.
+
+    Args:
+        created (datetime): The robot's creation time.
+
+    Returns:
+        date: The day in the current time zone.
+    """
+    if timezone.is_aware(created):
+        return timezone.localdate(created)
+    return created.date()
+
+
+def record_production(robots):
+    """
+    Add newly created robots to the daily production rollup.
+
+    Robots are grouped by (SKU, day) first, so a bulk batch costs one
+    update per group rather than one per robot.
+
+    Args:
+        robots: An iterable of created Robot instances.
+    """
+    now = timezone.now()
+    for (sku_id, day), count in _count_by_day(robots).items():
+        rollup = DailyProduction.objects.filter(sku_id=sku_id, day=day)
+        if rollup.update(count=F('count') + count, updated=now):
+            continue
+        try:
+            with transaction.atomic():
+                DailyProduction.objects.create(sku_id=sku_id, day=day, count=count, updated=now)
+        except IntegrityError:
+            # Another request created the row in the meantime
+            rollup.update(count=F('count') + count, updated=now)
+
+
+def discard_production(robots):
+    """
+    Remove deleted robots from the daily production rollup.
+
+    Args:
+        robots: An iterable of deleted Robot instances.
+    """
+    now = timezone.now()
+    for (sku_id, day), count in _count_by_day(robots).items():
+        DailyProduction.objects.filter(sku_id=sku_id, day=day).update(
+            count=F('count') - count, updated=now
+        )
+
+
+def _count_by_day(robots):
+    return Counter((robot.sku_id, production_day(robot.created)) for robot in robots)
+
+
+@transaction.atomic
+def rebuild_production_rollup():
+    """
+    Recompute the whole daily production rollup from the robots and archived robots tables.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    DailyProduction.objects.all().delete()
+    counts = Counter()
+    # Archived robots were produced too, so both tiers are counted
+    for model_class in (Robot, ArchivedRobot):
+        rows = (
+            model_class.objects.annotate(day=TruncDate('created', tzinfo=timezone.get_current_timezone()))
+            .values('sku_id', 'day')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for row in rows.iterator():
+            counts[row['sku_id'], row['day']] += row['count']
+    rollups = [
+        DailyProduction(sku_id=sku_id, day=day, count=count)
+        for (sku_id, day), count in counts.items()
+    ]
+    DailyProduction.objects.bulk_create(rollups, batch_size=ROLLUP_BATCH_SIZE)
+    return len(rollups)
+
+
+def count_production(since, until=None, chunk_size=ROLLUP_BATCH_SIZE):
+    """
+    Count robots per model and version created since the given moment.
+
+    Whole days after ``since`` (and before ``until``) are summed from the rollup; only
+    the partial days at the ends of the window are counted from the robots and archived
+    robots tables, so the result matches a raw scan of both tiers exactly. Counts are
+    kept by SKU id and only mapped to model and version through the catalog at the end.
+
+    Args:
+        since (datetime): The start of the window.
+        until (datetime | None): The end of the window, excluded; open-ended if None.
+        chunk_size (int): The number of rollup rows fetched at once.
+
+    Returns:
+        Counter: Robot counts keyed by (model, version).
+    """
+    first_day = production_day(since)
+    next_day = _day_start(first_day + timedelta(days=1))
+    partial_ranges = [(since, next_day if until is None else min(next_day, until))]
+    full_days = DailyProduction.objects.filter(day__gt=first_day)
+    if until is not None:
+        last_day = production_day(until)
+        if last_day > first_day:
+            full_days = full_days.filter(day__lt=last_day)
+            partial_ranges.append((_day_start(last_day), until))
+        else:
+            full_days = full_days.none()
+    sku_counts = Counter()
+
+    for start, end in partial_ranges:
+        if start >= end:
+            continue
+        for model_class in (Robot, ArchivedRobot):
+            partial_day = (
+                model_class.objects.filter(created__gte=start, created__lt=end)
+                .values('sku_id')
+                .annotate(count=Count('id'))
+                .order_by()
+            )
+            for row in partial_day:
+                sku_counts[row['sku_id']] += row['count']
+
+    full_days = (
+        full_days
+        .values('sku_id')
+        .annotate(count=Sum('count'))
+        .filter(count__gt=0)
+        .order_by()
+    )
+    for row in full_days.iterator(chunk_size=chunk_size):
+        sku_counts[row['sku_id']] += row['count']
+
+    counts = Counter()
+    for sku_id, count in sku_counts.items():
+        sku = get_sku_by_id(sku_id)
+        counts[sku.model, sku.version] += count
+    return counts
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
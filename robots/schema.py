@@ -0,0 +1,193 @@
+from datetime import date, datetime
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.validators import MaxLengthValidator, ProhibitNullCharactersValidator, validate_email
+from django.forms.utils import from_current_timezone
+from django.utils.dateparse import parse_datetime
+
+from robots.catalog import validate_sku
+from robots.validators import validate_creation_date, validate_model_version
+
+EMPTY_VALUES = (None, '', [], (), {})
+REQUIRED_MESSAGE = 'This field is required.'
+INVALID_DATETIME_MESSAGE = 'Enter a valid date/time.'
+
+
+class SchemaField:
+    """
+    A lean counterpart of a Django form field.
+
+    Values are converted and checked the same way the matching form field does it,
+    including the order and text of error messages, without building a form,
+    bound fields and widgets for every request.
+
+    Attributes:
+        validators (list): Validators run on the converted value, in form field order.
+    """
+
+    def __init__(self, validators=()):
+        self.validators = list(validators)
+
+    def to_python(self, value):
+        return value
+
+    def clean(self, value):
+        """
+        Convert and validate a raw value.
+
+        Args:
+            value: The raw value from the decoded JSON payload.
+
+        Returns:
+            The converted value.
+
+        Raises:
+            ValidationError: With all messages for the value, in form field order.
+        """
+        value = self.to_python(value)
+        if value in EMPTY_VALUES:
+            raise ValidationError(REQUIRED_MESSAGE, code='required')
+        messages = []
+        for validator in self.validators:
+            try:
+                validator(value)
+            except ValidationError as e:
+                messages.extend(e.messages)
+        if messages:
+            raise ValidationError(messages)
+        return value
+
+
+class CharField(SchemaField):
+    def __init__(self, max_length=None, validators=()):
+        validators = list(validators)
+        if max_length is not None:
+            validators.append(MaxLengthValidator(max_length))
+        validators.append(ProhibitNullCharactersValidator())
+        super().__init__(validators)
+
+    def to_python(self, value):
+        if value in EMPTY_VALUES:
+            return ''
+        if not isinstance(value, str):
+            value = str(value)
+        return value.strip()
+
+
+class EmailField(CharField):
+    def __init__(self, max_length=None, validators=()):
+        super().__init__(max_length, [validate_email, *validators])
+
+
+class DateTimeField(SchemaField):
+    """
+    A datetime field accepting the same inputs as ``forms.DateTimeField``.
+
+    Canonical ``YYYY-MM-DD HH:MM:SS`` values are parsed by slicing; anything else goes
+    through ``parse_datetime`` and then ``strptime`` with ``input_formats``, in the
+    order the form field tries them.
+    """
+
+    input_formats = ('%Y-%m-%d %H:%M:%S',)
+
+    def to_python(self, value):
+        if value in EMPTY_VALUES:
+            return None
+        if isinstance(value, datetime):
+            return from_current_timezone(value)
+        if isinstance(value, date):
+            return from_current_timezone(datetime(value.year, value.month, value.day))
+        if not isinstance(value, str):
+            raise ValidationError(INVALID_DATETIME_MESSAGE, code='invalid')
+        return from_current_timezone(self.parse(value.strip()))
+
+    def parse(self, value):
+        try:
+            if self.is_canonical(value):
+                return datetime(
+                    int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                    int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                )
+            result = parse_datetime(value)
+        except ValueError:
+            raise ValidationError(INVALID_DATETIME_MESSAGE, code='invalid')
+        if result is not None:
+            return result
+        for input_format in self.input_formats:
+            try:
+                return datetime.strptime(value, input_format)
+            except ValueError:
+                continue
+        raise ValidationError(INVALID_DATETIME_MESSAGE, code='invalid')
+
+    @staticmethod
+    def is_canonical(value):
+        if len(value) != 19 or value[4] != '-' or value[7] != '-' or value[10] != ' ':
+            return False
+        if value[13] != ':' or value[16] != ':':
+            return False
+        digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]
+        return digits.isascii() and digits.isdigit()
+
+
+class Schema:
+    """
+    A set of named fields validating a decoded JSON object.
+
+    Attributes:
+        checks (list): Callables validating the cleaned values together, like a form's
+            ``clean()``; their errors are reported under ``__all__``.
+        fields (dict): The schema fields by payload key, in the order errors are reported.
+    """
+
+    def __init__(self, checks=(), **fields):
+        self.checks = list(checks)
+        self.fields = fields
+
+    def validate(self, data):
+        """
+        Validate a decoded JSON object.
+
+        Args:
+            data (dict): The decoded payload.
+
+        Returns:
+            tuple: The cleaned values and a dict of error message lists by field, shaped like ``form.errors``.
+        """
+        cleaned_data = {}
+        errors = {}
+        for name, field in self.fields.items():
+            try:
+                cleaned_data[name] = field.clean(data.get(name))
+            except ValidationError as e:
+                errors[name] = e.messages
+        for check in self.checks:
+            try:
+                check(cleaned_data)
+            except ValidationError as e:
+                errors.setdefault(NON_FIELD_ERRORS, []).extend(e.messages)
+        return cleaned_data, errors
+
+    async def avalidate(self, data):
+        """
+        Asynchronous version of ``validate`` for async views.
+
+        Checks may reload the SKU catalog from the database, so validation runs in
+        the thread used for the async ORM.
+        """
+        return await sync_to_async(self.validate)(data)
+
+
+def check_robot_sku(cleaned_data):
+    # Same as RobotCreateForm.clean(): the model and version must exist in the catalog
+    if 'model' in cleaned_data and 'version' in cleaned_data:
+        validate_sku(cleaned_data['model'], cleaned_data['version'])
+
+
+ROBOT_SCHEMA = Schema(
+    checks=[check_robot_sku],
+    model=CharField(max_length=2, validators=[validate_model_version]),
+    version=CharField(max_length=2, validators=[validate_model_version]),
+    created=DateTimeField(validators=[validate_creation_date]),
+)
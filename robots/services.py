@@ -1,28 +1,33 @@
+import io
+import queue
+import threading
 from datetime import timedelta
 
-from django.db.models import Count
 from django.utils import timezone
-from openpyxl.workbook import Workbook
 
 from robots.models import Robot
+from robots.rollup import count_production
 
+REPORT_HEADERS = ('Model', 'Version', 'Count for the week')
+REPORT_PERIOD = timedelta(days=7)
+STREAM_BUFFER_SIZE = 64 * 1024
+STREAM_QUEUE_SIZE = 16
 
-def generate_report():
-    # Calculate the date one week ago from now
-    one_week_ago = timezone.now() - timedelta(days=7)
+
+def generate_report(one_week_ago=None, until=None):
+    # Calculate the date one week ago from now, unless the window start is given;
+    # the window runs until now, unless its end is given
+    one_week_ago = one_week_ago or get_report_start()
 
     # Create an Excel workbook
     workbook = create_excel_workbook()
 
     # Get and filter robot data for the past week
-    robot_data = filter_robot_data(one_week_ago)
+    robot_data = filter_robot_data(one_week_ago, until)
 
     # Process the robot data and add it to the sheets
     for item in robot_data:
         sheet = get_or_create_sheet(workbook, item['model'])
-        if 'A1' not in sheet:
-            initialize_sheet(sheet)
-
         add_data_to_sheet(sheet, item)
 
     # Remove the default 'Sheet'
@@ -32,45 +37,149 @@ def generate_report():
     return workbook, robot_data
 
 
-def create_excel_workbook():
-    # Create a new Excel workbook
-    return Workbook()
+def stream_report():
+    # Build a write-only workbook from the ordered report rows, then yield the xlsx bytes
+    # while they are being zipped, so the file is never held in memory. The rows are
+    # counted and written before the first chunk: openpyxl only zips a write-only sheet
+    # once it is closed, so this bounds memory use, not the time to the first byte
+    one_week_ago = get_report_start()
+    workbook = create_excel_workbook(write_only=True)
+
+    sheet = None
+    for item in iter_robot_data(one_week_ago):
+        if sheet is None or sheet.title != item['model']:
+            sheet = workbook.create_sheet(item['model'])
+            initialize_sheet(sheet)
+        add_data_to_sheet(sheet, item)
+
+    yield from iter_workbook_bytes(workbook)
+
+
+def get_report_start():
+    # Calculate the start of the reporting window
+    return timezone.now() - REPORT_PERIOD
+
+
+def create_excel_workbook(write_only=False):
+    # Create a new Excel workbook; openpyxl is imported on first use, as most
+    # processes never render a report
+    from openpyxl.workbook import Workbook
+
+    return Workbook(write_only=write_only)
+
+
+def filter_robot_data(one_week_ago, until=None):
+    # Sum the daily production rollup for the last week, ordered by model and version
+    counts = count_production(one_week_ago, until)
+    return [
+        {'model': model, 'version': version, 'count': count}
+        for (model, version), count in sorted(counts.items())
+    ]
+
+
+def iter_robot_data(one_week_ago):
+    # Iterate robot data ordered by model, so every sheet is written in one go
+    return iter(filter_robot_data(one_week_ago))
 
 
-def filter_robot_data(one_week_ago):
-    # Filter robot data created within the last week
-    return (
-        Robot.objects.filter(created__gte=one_week_ago)
-        .values('model', 'version')
-        .annotate(count=Count('id'))
-        .distinct()
-    )
+def robot_data_exists(one_week_ago):
+    # Check whether any robot was created within the last week
+    return Robot.objects.filter(created__gte=one_week_ago).exists()
 
 
 def get_or_create_sheet(workbook, model):
     # Get or create a sheet with the given model name
-    return (
-        workbook.get_sheet_by_name(model)
-        if model in workbook.sheetnames
-        else workbook.create_sheet(model)
-    )
+    if model in workbook.sheetnames:
+        return workbook[model]
+    sheet = workbook.create_sheet(model)
+    initialize_sheet(sheet)
+    return sheet
 
 
 def initialize_sheet(sheet):
     # Initialize the headers in the sheet
-    sheet['A1'] = 'Model'
-    sheet['B1'] = 'Version'
-    sheet['C1'] = 'Count for the week'
+    sheet.append(REPORT_HEADERS)
 
 
 def add_data_to_sheet(sheet, item):
     # Add data to the sheet
-    row = sheet.max_row + 1
-    sheet.cell(row=row, column=1, value=item['model'])
-    sheet.cell(row=row, column=2, value=item['version'])
-    sheet.cell(row=row, column=3, value=item['count'])
+    sheet.append((item['model'], item['version'], item['count']))
 
 
 def remove_default_sheet(workbook):
     # Remove the default 'Sheet'
-    workbook.remove(workbook['Sheet'])
\ No newline at end of file
+    workbook.remove(workbook['Sheet'])
+
+
+def iter_workbook_bytes(workbook):
+    # Save the workbook in a background thread and yield the zip bytes as they are
+    # produced; the bounded queue keeps the writer at most a few chunks ahead
+    chunks = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    cancelled = threading.Event()
+    errors = []
+
+    def save():
+        writer = _QueueWriter(chunks, cancelled)
+        try:
+            workbook.save(writer)
+            writer.drain()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            try:
+                writer.put(None)
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=save, name='robot-report-writer', daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+        thread.join()
+        if errors:
+            raise errors[0]
+    finally:
+        # Stop the writer if the client went away before the download finished
+        cancelled.set()
+
+
+class _QueueWriter(io.RawIOBase):
+    """
+    A write-only, non-seekable file object that hands buffered chunks to a queue.
+
+    ``zipfile`` writes data descriptors instead of seeking back when the target
+    is not seekable, which lets openpyxl save straight into a streaming response.
+    """
+
+    def __init__(self, chunks, cancelled):
+        super().__init__()
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= STREAM_BUFFER_SIZE:
+            self.drain()
+        return len(data)
+
+    def drain(self):
+        if self._buffer:
+            self.put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def put(self, chunk):
+        while not self._cancelled.is_set():
+            try:
+                self._chunks.put(chunk, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise OSError('The report stream was closed by the reader.')
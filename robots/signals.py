@@ -0,0 +1,77 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from R4C.metrics import timed_receiver
+from robots.catalog import catalog
+from robots.models import Robot, RobotSku
+from robots.rollup import discard_production, record_production
+from robots.stock import add_to_stock, remove_from_stock
+
+# Sent after a batch of robots has been written with ``bulk_create``, which
+# bypasses ``post_save``. Receivers get the created instances as ``robots``.
+robots_created = Signal()
+
+
+@receiver(post_save, sender=Robot)
+@timed_receiver
+def update_production_rollup(sender, instance, created, **kwargs):
+    """
+    Custom signal receiver to count a newly created robot in the daily production rollup
+    and the available stock. The rollup also versions the cached weekly report.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The instance of the Robot model that triggered the signal.
+        created: A boolean indicating whether the instance was just created.
+        kwargs: Additional keyword arguments.
+    """
+    if created:
+        record_production([instance])
+        add_to_stock([instance])
+
+
+@receiver(post_delete, sender=Robot)
+@timed_receiver
+def discard_from_production_rollup(sender, instance, **kwargs):
+    """
+    Custom signal receiver to keep the daily production rollup and the available stock
+    in sync when a robot is deleted.
+
+    Args:
+        sender: The sender of the signal.
+        instance: The deleted instance of the Robot model.
+        kwargs: Additional keyword arguments.
+    """
+    discard_production([instance])
+    remove_from_stock([instance])
+
+
+@receiver(robots_created, sender=Robot)
+@timed_receiver
+def update_bulk_production_rollup(sender, robots, **kwargs):
+    """
+    Custom signal receiver to count robots created in bulk in the daily production rollup
+    and the available stock.
+
+    Args:
+        sender: The sender of the signal.
+        robots: The list of created Robot instances.
+        kwargs: Additional keyword arguments.
+    """
+    record_production(robots)
+    add_to_stock(robots)
+
+
+@receiver(post_save, sender=RobotSku)
+@receiver(post_delete, sender=RobotSku)
+@timed_receiver
+def reload_sku_catalog(sender, **kwargs):
+    """
+    Custom signal receiver to drop the in-process SKU catalog when an SKU is saved or deleted,
+    so the next lookup reloads it.
+
+    Args:
+        sender: The sender of the signal.
+        kwargs: Additional keyword arguments.
+    """
+    catalog.clear()
@@ -0,0 +1,252 @@
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+
+from orders.models import Order
+from robots.catalog import get_sku_by_id
+from robots.models import Robot, StockCounter
+
+STOCK_BATCH_SIZE = 1000
+
+
+def claim_robot(sku_id):
+    """
+    Reserve one available robot of the given SKU.
+
+    On databases supporting ``SELECT ... FOR UPDATE SKIP LOCKED`` the oldest unlocked
+    robot is locked and marked as ordered, so concurrent claims pick different rows
+    without waiting on each other. Elsewhere the robot is claimed with a single
+    conditional UPDATE that only succeeds while the robot is still not ordered, and
+    the next available robot is tried if a concurrent request won the race.
+
+    Args:
+        sku_id (int): The id of the SKU of the robot to reserve.
+
+    Returns:
+        int | None: The id of the reserved robot, or None if none is available.
+    """
+    available = Robot.objects.filter(sku_id=sku_id, ordered=False).order_by('id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            robot_id = available.select_for_update(skip_locked=True).values_list('id', flat=True).first()
+            if robot_id is not None:
+                Robot.objects.filter(pk=robot_id).update(ordered=True)
+            return robot_id
+
+    if _can_update_returning():
+        robot_ids = _claim_returning(available, 1)
+        return robot_ids[0] if robot_ids else None
+
+    while True:
+        robot_id = available.values_list('id', flat=True).first()
+        if robot_id is None:
+            return None
+        if Robot.objects.filter(pk=robot_id, ordered=False).update(ordered=True):
+            return robot_id
+
+
+def claim_robots(sku_id, count):
+    """
+    Reserve up to ``count`` available robots of the given SKU, oldest first.
+
+    The set-based counterpart of ``claim_robot``, with the same guarantees against
+    concurrent claims: with ``SKIP LOCKED`` the robots are locked and marked in two
+    statements, elsewhere a single conditional UPDATE claims them all, retried only
+    for robots a concurrent request took in the meantime. The stock counters are not
+    touched, so the caller can move them once per SKU.
+
+    Args:
+        sku_id (int): The id of the SKU of the robots to reserve.
+        count (int): The number of robots wanted.
+
+    Returns:
+        list: The ids of the reserved robots, fewer than ``count`` if the stock ran out.
+    """
+    available = Robot.objects.filter(sku_id=sku_id, ordered=False).order_by('id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            robot_ids = list(available.select_for_update(skip_locked=True).values_list('id', flat=True)[:count])
+            Robot.objects.filter(pk__in=robot_ids).update(ordered=True)
+            return robot_ids
+
+    if _can_update_returning():
+        return _claim_returning(available, count)
+
+    robot_ids = []
+    while len(robot_ids) < count:
+        candidates = list(available.values_list('id', flat=True)[:count - len(robot_ids)])
+        if not candidates:
+            break
+        robot_ids.extend(
+            robot_id for robot_id in candidates
+            if Robot.objects.filter(pk=robot_id, ordered=False).update(ordered=True)
+        )
+    return robot_ids
+
+
+def reserve_robot(sku_id):
+    """
+    Reserve one available robot of the given SKU, checking the stock counter first.
+
+    The counter is decremented with a conditional UPDATE before any robot is looked up,
+    so an order for an SKU that is out of stock costs a single write and no scan of
+    the robots table.
+
+    Args:
+        sku_id (int): The id of the SKU of the robot to reserve.
+
+    Returns:
+        int | None: The id of the reserved robot, or None if none is available.
+    """
+    with transaction.atomic():
+        if not take_from_stock(sku_id):
+            return None
+        # The counter only drifts from the robots table if rows were changed behind
+        # the signals; the claim still decides, and the decrement stays as a correction
+        return claim_robot(sku_id)
+
+
+async def areserve_robot(sku_id):
+    """
+    Asynchronous version of ``reserve_robot``.
+
+    The reservation runs in the thread used for the async ORM, as the counter update
+    and the claim have to share one transaction.
+    """
+    return await sync_to_async(reserve_robot)(sku_id)
+
+
+def take_from_stock(sku_id):
+    """
+    Decrement the available stock counter of an SKU if it is positive.
+
+    Args:
+        sku_id (int): The SKU id.
+
+    Returns:
+        bool: True if the counter said a robot was in stock.
+    """
+    return bool(
+        StockCounter.objects.filter(sku_id=sku_id, available__gt=0).update(available=F('available') - 1)
+    )
+
+
+def adjust_stock(sku_id, available=0, waiting=0):
+    """
+    Add to the available stock and waiting order counters of an SKU.
+
+    Args:
+        sku_id (int): The SKU id.
+        available (int): The change of robots in stock.
+        waiting (int): The change of orders waiting for a robot.
+    """
+    counter = StockCounter.objects.filter(sku_id=sku_id)
+    if counter.update(available=F('available') + available, waiting=F('waiting') + waiting):
+        return
+    try:
+        with transaction.atomic():
+            StockCounter.objects.create(sku_id=sku_id, available=available, waiting=waiting)
+    except IntegrityError:
+        # Another request created the row in the meantime
+        counter.update(available=F('available') + available, waiting=F('waiting') + waiting)
+
+
+def add_to_stock(robots):
+    """
+    Count robots that are not ordered yet in the available stock, one update per SKU.
+
+    Args:
+        robots: An iterable of created Robot instances.
+    """
+    for sku_id, count in Counter(robot.sku_id for robot in robots if not robot.ordered).items():
+        adjust_stock(sku_id, available=count)
+
+
+def remove_from_stock(robots):
+    """
+    Remove deleted robots that were not ordered from the available stock.
+
+    Args:
+        robots: An iterable of deleted Robot instances.
+    """
+    for sku_id, count in Counter(robot.sku_id for robot in robots if not robot.ordered).items():
+        adjust_stock(sku_id, available=-count)
+
+
+def get_stock(sku_id=None):
+    """
+    Get the stock counters, without scanning the robots or orders tables.
+
+    Args:
+        sku_id (int | None): Limit the result to one SKU.
+
+    Returns:
+        list: Dicts with ``serial``, ``available`` and ``waiting``, ordered by serial.
+    """
+    counters = StockCounter.objects.all()
+    if sku_id is not None:
+        counters = counters.filter(sku_id=sku_id)
+    stock = [
+        {'serial': get_sku_by_id(row['sku_id']).serial, 'available': row['available'], 'waiting': row['waiting']}
+        for row in counters.values('sku_id', 'available', 'waiting')
+    ]
+    return sorted(stock, key=lambda row: row['serial'])
+
+
+@transaction.atomic
+def rebuild_stock_counters():
+    """
+    Recompute all stock counters from the robots and orders tables.
+
+    Returns:
+        int: The number of counter rows written.
+    """
+    counters = {}
+    available = Robot.objects.filter(ordered=False).values('sku_id').annotate(count=Count('id')).order_by()
+    for row in available:
+        counters.setdefault(row['sku_id'], StockCounter(sku_id=row['sku_id'])).available = row['count']
+    waiting = (
+        Order.objects.filter(status='ROBOT_IS_OUT_OF_STOCK')
+        .values('sku_id').annotate(count=Count('id')).order_by()
+    )
+    for row in waiting:
+        counters.setdefault(row['sku_id'], StockCounter(sku_id=row['sku_id'])).waiting = row['count']
+
+    StockCounter.objects.all().delete()
+    StockCounter.objects.bulk_create(counters.values(), batch_size=STOCK_BATCH_SIZE)
+    return len(counters)
+
+
+def _can_update_returning():
+    # UPDATE ... RETURNING exists on PostgreSQL and on SQLite since 3.35; other
+    # backends (MySQL, MariaDB) only return columns from INSERT, if at all
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35)
+
+
+def _claim_returning(available, count):
+    # UPDATE ... WHERE id IN (SELECT ... LIMIT n) AND NOT ordered RETURNING id, so the
+    # claim is one write statement that also tells which robots were taken
+    quote = connection.ops.quote_name
+    robot_ids = []
+    while len(robot_ids) < count:
+        wanted = count - len(robot_ids)
+        subquery, params = available.values('id')[:wanted].query.sql_with_params()
+        sql = (
+            f'UPDATE {quote(Robot._meta.db_table)} SET {quote("ordered")} = %s '
+            f'WHERE {quote("id")} IN ({subquery}) AND {quote("ordered")} = %s '
+            f'RETURNING {quote("id")}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (True, *params, False))
+            claimed = [row[0] for row in cursor.fetchall()]
+        robot_ids.extend(claimed)
+        # Fewer rows than asked for: either the stock ran out or a concurrent claim won a race
+        if len(claimed) < wanted and not available.exists():
+            break
+    return sorted(robot_ids)
@@ -1,8 +1,18 @@
-from django.urls import path
+from django.urls import path, re_path
 
-from .views import RobotCreateView, RobotReportView
+from .views import (
+    AsyncRobotCreateView, RobotAnalyticsView, RobotBulkCreateView, RobotCreateView, RobotExportView,
+    RobotReportHistoryView, RobotReportView, RobotStockView, RobotWeeklyReportView,
+)
 
 urlpatterns = [
     path('create_robot/', RobotCreateView.as_view(), name='create_robot'),
+    path('async/create_robot/', AsyncRobotCreateView.as_view(), name='async_create_robot'),
+    path('create_robots/', RobotBulkCreateView.as_view(), name='bulk_create_robots'),
+    path('stock/', RobotStockView.as_view(), name='robot_stock'),
     path('robot_report/', RobotReportView.as_view(), name='download_report'),
+    path('robot_reports/', RobotReportHistoryView.as_view(), name='report_history'),
+    re_path(r'^robot_reports/(?P<week>\d{4}-W\d{2})/$', RobotWeeklyReportView.as_view(), name='weekly_report'),
+    path('robot_export/', RobotExportView.as_view(), name='export_robots'),
+    path('analytics/production/', RobotAnalyticsView.as_view(), name='production_analytics'),
 ]
@@ -3,6 +3,8 @@ from datetime import datetime
 
 from django.core.exceptions import ValidationError
 
+MODEL_VERSION_PATTERN = re.compile(r"^[a-zA-Z0-9]*$")
+
 
 def validate_model_version(value):
     """
@@ -17,8 +19,7 @@ def validate_model_version(value):
     Raises:
         ValidationError: If the value is not a combination of digits or English letters.
     """
-    pattern = r"^[a-zA-Z0-9]*$"
-    if re.match(pattern, value):
+    if MODEL_VERSION_PATTERN.match(value):
         return value
     raise ValidationError(
         "Invalid model or version name. It should consist of digits or English letters."
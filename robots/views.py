@@ -1,15 +1,28 @@
-import io
 import json
-from datetime import date
+import os
+from datetime import date, timedelta
 
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse, FileResponse, HttpResponseNotFound
+from django.http import FileResponse, JsonResponse, HttpResponse, HttpResponseNotFound, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.urls import reverse
+from django.utils.http import http_date
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
-from robots.services import generate_report
-from robots.forms import RobotCreateForm
+from robots.analytics import get_production_series, parse_analytics_params
+from robots.catalog import catalog
+from robots.export import EXPORT_FORMATS, iter_production_rows, parse_export_params, stream_export
+from robots.idempotency import (
+    IdempotencyConflict, IdempotencyError, acreate_robot_once, create_robot_once, get_idempotency_key,
+)
+from robots import report_files
+from robots.report_cache import get_cached_report
+from robots.schema import ROBOT_SCHEMA
+from robots.services import get_report_start, robot_data_exists, stream_report
+from robots.stock import get_stock
+from robots.ingestion import acreate_robot, bulk_create_robots, create_robot, iter_request_rows
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -18,26 +31,43 @@ class RobotCreateView(View):
     View for creating a robot.
 
     Accepts a POST request with JSON data containing the robot details.
+    The data is validated with ``ROBOT_SCHEMA``, which applies the ``RobotCreateForm`` rules.
     If the data is valid, the robot is saved and a success message is returned.
     If the data is invalid, a JSON response with the form errors is returned.
     If the JSON data is invalid, a JSON response with an error message is returned.
     If any other exception occurs, a JSON response with the error message is returned.
+
+    A request with an ``Idempotency-Key`` header, or with ``controller_id`` and
+    ``sequence`` in its data, creates at most one robot: a retry gets the original
+    response with an ``Idempotent-Replayed`` header, and reusing the key for a
+    different robot gets a 422 response.
     """
 
     def post(self, request, *args, **kwargs):
         try:
-            request_data = json.loads(request.body.decode("utf-8"))
-            form = RobotCreateForm(request_data)
+            request_data = json.loads(request.body)
+            if not isinstance(request_data, dict):
+                return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+            key = get_idempotency_key(request, request_data)
+            cleaned_data, errors = ROBOT_SCHEMA.validate(request_data)
 
-            if form.is_valid():
-                form.save_robot()
-                return JsonResponse({"message": "The robot has been created."})
-            else:
-                return JsonResponse({"errors": form.errors}, status=400)
+            if errors:
+                return JsonResponse({"errors": errors}, status=400)
+            if key is None:
+                create_robot(**cleaned_data)
+                return robot_created_response()
+            _, created = create_robot_once(key, **cleaned_data)
+            return robot_created_response(replayed=not created)
 
         except json.JSONDecodeError:
             return JsonResponse({'error': 'Invalid JSON data'}, status=400)
 
+        except IdempotencyConflict as e:
+            return JsonResponse({'error': str(e)}, status=422)
+
+        except IdempotencyError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
         except ValidationError as e:
             return JsonResponse({"error": str(e)}, status=400)
 
@@ -45,6 +75,101 @@ class RobotCreateView(View):
             return JsonResponse({"error": str(e)}, status=400)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncRobotCreateView(View):
+    """
+    Asynchronous version of ``RobotCreateView`` for ASGI deployments.
+
+    Validation, which may reload the SKU catalog, and saving run in the thread used
+    for the async ORM, so no blocking work is done on the loop itself. Replays of
+    recently seen idempotency keys are answered on the loop.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            request_data = json.loads(request.body)
+            if not isinstance(request_data, dict):
+                return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+            key = get_idempotency_key(request, request_data)
+            cleaned_data, errors = await ROBOT_SCHEMA.avalidate(request_data)
+
+            if errors:
+                return JsonResponse({"errors": errors}, status=400)
+            if key is None:
+                await acreate_robot(**cleaned_data)
+                return robot_created_response()
+            _, created = await acreate_robot_once(key, **cleaned_data)
+            return robot_created_response(replayed=not created)
+
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+
+        except IdempotencyConflict as e:
+            return JsonResponse({'error': str(e)}, status=422)
+
+        except IdempotencyError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        except ValidationError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+def robot_created_response(replayed=False):
+    # The robot creation response; a replay of an idempotent request is marked with a header
+    response = JsonResponse({"message": "The robot has been created."})
+    if replayed:
+        response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class RobotBulkCreateView(View):
+    """
+    View for creating robots in bulk.
+
+    Accepts a POST request with either an NDJSON body (one robot per line, sent as
+    ``application/x-ndjson``) or a JSON array of robots. The body is read as a stream,
+    rows are validated in chunks and valid robots are inserted with batched inserts
+    inside one transaction. Invalid rows are skipped and reported with their row number.
+    If the body is not a well-formed JSON array, nothing is saved and a 400 response is returned.
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            created, errors = bulk_create_robots(iter_request_rows(request))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse({'created': created, 'errors': errors})
+
+
+class RobotStockView(View):
+    """
+    View for the robot stock and order backlog.
+
+    Accepts a GET request and returns the number of robots in stock and orders waiting
+    for a robot per serial, read from the stock counters without scanning robots or orders.
+    With the ``serial`` query parameter only that serial is returned, with zero counters
+    if nothing was ever produced or ordered for it.
+    """
+
+    def get(self, request):
+        serial = request.GET.get('serial')
+        stock = []
+        if serial is None:
+            stock = get_stock()
+        else:
+            sku = catalog.get_by_serial(serial)
+            if sku is not None:
+                stock = get_stock(sku.id)
+        if serial is not None and not stock:
+            stock = [{'serial': serial, 'available': 0, 'waiting': 0}]
+        return JsonResponse({'stock': stock})
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class RobotReportView(View):
     """
@@ -53,24 +178,175 @@ class RobotReportView(View):
     Accepts a GET request to generate the report.
     If no robots were manufactured in the past week, a 404 response is returned.
     If the report is generated successfully, it is saved as an Excel file and returned as a file response.
+    Rendered reports are cached per reporting window until a robot inside the window is created,
+    and are served with ``ETag``/``Last-Modified`` headers so repeated downloads get a 304 response.
+    With the ``stream=1`` query parameter the report is built with write-only worksheets and the
+    xlsx file is streamed while it is being zipped, so it is never held in memory; the first
+    byte is sent once all rows have been counted and written to the sheets.
     The filename of the downloaded file includes the current date.
+
+    While the rolling report rendered by ``render_robot_reports --rolling`` is fresher than
+    ``ROBOT_REPORT_MAX_AGE``, it is served from disk instead, see ``serve_file``.
     """
 
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
     def get(self, request):
-        workbook, report_data = generate_report()
-        if not report_data:
-            return HttpResponseNotFound(
-                {'No robots were manufactured in the past week.'}
-            )
-        buffer = io.BytesIO()
-        workbook.save(buffer)
-        buffer.seek(0)
-        current_date = date.today().strftime('%Y-%m-%d')
-        response = FileResponse(
-            buffer,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        if request.GET.get('stream'):
+            return self.stream(request)
+
+        rolling = report_files.get_rolling_report()
+        if rolling is not None:
+            return self.serve_file(request, rolling)
+
+        report = get_cached_report()
+        not_modified = get_conditional_response(
+            request, etag=report.etag, last_modified=report.last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        content = report.get_content()
+        if not content:
+            return self.not_found()
+        response = HttpResponse(content, content_type=self.content_type)
+        response['ETag'] = report.etag
+        response['Last-Modified'] = http_date(report.last_modified)
+        return self.attach(response)
+
+    def stream(self, request):
+        if not robot_data_exists(get_report_start()):
+            return self.not_found()
+        response = StreamingHttpResponse(stream_report(), content_type=self.content_type)
+        return self.attach(response)
+
+    @classmethod
+    def serve_file(cls, request, report):
+        """
+        Serve a pre-rendered report file, honoring conditional request headers.
+
+        The file is handed to the server rather than read into memory: with
+        ``ROBOT_REPORT_SENDFILE`` set the front server sends it on an ``X-Sendfile`` or
+        ``X-Accel-Redirect`` header, otherwise ``FileResponse`` streams the open file,
+        using the WSGI server's ``sendfile`` support where available.
+        """
+        try:
+            file = open(report.path, 'rb')
+        except FileNotFoundError:
+            return cls.not_found()
+        stat = os.fstat(file.fileno())
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if not_modified is not None:
+            file.close()
+            return not_modified
+
+        if report_files.REPORT_SENDFILE:
+            file.close()
+            response = HttpResponse(content_type=cls.content_type)
+            if report_files.REPORT_SENDFILE == 'x-accel-redirect':
+                response['X-Accel-Redirect'] = report_files.REPORT_ACCEL_PREFIX + report.filename
+            else:
+                response['X-Sendfile'] = report.path
+        else:
+            response = FileResponse(file, content_type=cls.content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Content-Disposition'] = f'attachment; filename={report.filename}'
+        return response
+
+    @staticmethod
+    def not_found():
+        return HttpResponseNotFound(
+            {'No robots were manufactured in the past week.'}
         )
+
+    @staticmethod
+    def attach(response):
+        current_date = date.today().strftime('%Y-%m-%d')
         response[
             'Content-Disposition'
         ] = f'attachment; filename=robot_report_{current_date}.xlsx'
         return response
+
+
+class RobotReportHistoryView(View):
+    """
+    View listing the weekly reports rendered by ``render_robot_reports``, newest week first.
+
+    Each entry has the ISO week, its first and last day, the file size and the URL
+    the report is downloaded from.
+    """
+
+    def get(self, request):
+        reports = [
+            {
+                'week': report.week,
+                'start': report.week_start.isoformat(),
+                'end': (report.week_start + timedelta(days=6)).isoformat(),
+                'size': report.stat().st_size,
+                'url': reverse('weekly_report', args=[report.week]),
+            }
+            for report in report_files.list_weekly_reports()
+        ]
+        return JsonResponse({'reports': reports})
+
+
+class RobotWeeklyReportView(View):
+    """View for downloading the report of one closed ISO week, such as ``2023-W40``."""
+
+    def get(self, request, week):
+        report = report_files.get_weekly_report(week)
+        if report is None:
+            return HttpResponseNotFound({'No report was rendered for this week.'})
+        return RobotReportView.serve_file(request, report)
+
+
+class RobotAnalyticsView(View):
+    """
+    View for production counts per model and version, bucketed by hour, day or week.
+
+    Accepts a GET request with ``bucket=hour|day|week`` (``day`` by default), the ``from``
+    and optional ``to`` parameters of ``RobotExportView``, optional ``model`` and ``version``
+    filters and ``limit``, the number of buckets per page. The response has one series per
+    model and version with the counts of its non-empty buckets, and a ``next_cursor`` to
+    pass as ``cursor`` for the following buckets, or null on the last page.
+    If the parameters are invalid, a JSON response with the errors is returned.
+    """
+
+    def get(self, request):
+        params, errors = parse_analytics_params(request.GET)
+        if errors:
+            return JsonResponse({'errors': errors}, status=400)
+
+        series, next_cursor = get_production_series(
+            params['bucket'], params['start'], params['end'], params['limit'],
+            model=params['model'], version=params['version'],
+        )
+        return JsonResponse({'bucket': params['bucket'], 'series': series, 'next_cursor': next_cursor})
+
+
+class RobotExportView(View):
+    """
+    View for exporting produced robots over an arbitrary date range.
+
+    Accepts a GET request with the ``from`` and optional ``to`` parameters (a date or a
+    ``YYYY-MM-DD HH:MM:SS`` datetime) and ``format=csv|jsonl|xlsx``, ``csv`` by default.
+    One row per robot is streamed while it is read from the database in chunks, so
+    long ranges never have to fit in memory.
+    If the parameters are invalid, a JSON response with the errors is returned.
+    """
+
+    def get(self, request):
+        start, end, export_format, errors = parse_export_params(request.GET)
+        if errors:
+            return JsonResponse({'errors': errors}, status=400)
+
+        rows = iter_production_rows(start, end)
+        response = StreamingHttpResponse(
+            stream_export(rows, export_format), content_type=EXPORT_FORMATS[export_format]
+        )
+        last_day = end - timedelta(microseconds=1)
+        filename = f'robot_export_{start:%Y-%m-%d}_{last_day:%Y-%m-%d}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response